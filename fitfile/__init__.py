@@ -7,6 +7,11 @@ __license__ = "GPL"
 # flake8: noqa
 
 from .file import File
+from .decoder import iter_messages
+from .crc import Crc
+from .summary import QuickSummary, quick_summary
+from .batch import ParseResult, parse_many
+from .async_parse import aparse, aiter_messages
 from .message_type import UnknownMessageType, MessageType
 from .file_type import FileType
 from .manufacturer import Manufacturer
@@ -93,9 +93,16 @@ class ActivityTypeIntensityField(NamedField):
     def __init__(self, name, **kwargs):
         super().__init__(name, **kwargs)
 
+    def value_names(self):
+        """Return the names of the sub fields that converting the field produces."""
+        return [self.activity_type_field.name, self.intensity_field.name]
+
+    def field_value_names(self):
+        """Return the names of the sub fields that converting the field produces FieldValue instances for."""
+        return [self.activity_type_field.name, self.intensity_field.name]
+
     def convert(self, value, invalid, measurement_system):
         """Convert the value to sub fields."""
-        self.measurement_system = measurement_system
         activity_type = value & 0x1f
         intensity = value >> 5
         return self.activity_type_field.convert(activity_type, 0xff, measurement_system) + self.intensity_field.convert(intensity, 0xff, measurement_system)
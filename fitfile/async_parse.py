@@ -0,0 +1,57 @@
+"""Code that parses FIT files from asyncio streams."""
+
+__author__ = "Tom Goetz"
+__copyright__ = "Copyright Tom Goetz"
+__license__ = "GPL"
+
+
+from .file import File
+from .decoder import Decoder
+from .field_enums import DisplayMeasure, TimestampMode
+
+
+async def aparse(reader, measurement_system=DisplayMeasure.metric, filename=None, message_types=None, lazy=False, verify_crc=False, chunk_size=65536,
+                 compact=False, keep_messages=True, raw=False, timestamp_mode=TimestampMode.datetime):
+    """
+    Return a File instance by parsing a FIT file read from an asyncio.StreamReader.
+
+    The data is decoded a chunk at a time as it arrives, the event loop is never blocked reading the whole file and no temporary file is used.
+
+    Parameters:
+    ----------
+        reader (asyncio.StreamReader): A stream with a read(n) coroutine that returns the FIT file data, b'' at the end of the data.
+        measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to use when parsing the FIT file.
+        filename (string): An optional name to associate with the FIT file data.
+        message_types (collection): If given, only decode messages of these MessageTypes and the messages needed for the file summary.
+        lazy (bool): Hold the raw values of message fields and only convert fields the first time they are accessed.
+        verify_crc (bool): Check the header and file CRCs while parsing.
+        chunk_size (int): The maximum number of bytes to read from the stream at a time.
+        compact (bool): Store only the raw values of message fields and convert fields each time they are accessed, to minimize memory use.
+        keep_messages (bool): Keep all messages in the messages list as well as in the lists of messages of each message type.
+        raw (bool): Hold the raw values of the message fields without converting them, except for the messages the file summary is built from.
+        timestamp_mode (TimestampMode): Return message timestamps as datetimes or as integer FIT or Unix epoch seconds.
+
+    """
+    return await File.from_stream(reader, measurement_system, filename, message_types, lazy, verify_crc, chunk_size, compact, keep_messages, raw,
+                                  timestamp_mode)
+
+
+async def aiter_messages(reader, types=None, measurement_system=DisplayMeasure.metric, lazy=False, chunk_size=65536, raw=False,
+                         timestamp_mode=TimestampMode.datetime):
+    """
+    Asynchronously yield the data messages of a FIT file read from an asyncio.StreamReader as they are decoded without retaining them.
+
+    Parameters:
+    ----------
+        reader (asyncio.StreamReader): A stream with a read(n) coroutine that returns the FIT file data, b'' at the end of the data.
+        types (collection): If given, only messages whose MessageType is in the collection are decoded and yielded.
+        measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to use when decoding messages.
+        lazy (bool): Yield LazyDataMessage instances that convert fields the first time they are accessed.
+        chunk_size (int): The maximum number of bytes to read from the stream at a time.
+        raw (bool): Yield RawDataMessage instances holding the raw field values without converting them.
+        timestamp_mode (TimestampMode): Return timestamps as datetimes or as integer FIT or Unix epoch seconds.
+
+    """
+    decoder = Decoder(measurement_system, types, lazy, raw=raw, timestamp_mode=timestamp_mode)
+    async for data_message in decoder.amessages(reader, chunk_size):
+        yield data_message
@@ -0,0 +1,115 @@
+"""Code that parses many FIT files in parallel across a pool of processes."""
+
+__author__ = "Tom Goetz"
+__copyright__ = "Copyright Tom Goetz"
+__license__ = "GPL"
+
+
+import logging
+import traceback
+import itertools
+import concurrent.futures
+
+from .file import File
+from .field_enums import DisplayMeasure
+
+
+logger = logging.getLogger(__name__)
+
+
+class ParseResult():
+    """
+    The result of parsing a FIT file in a worker process.
+
+    Holds plain picklable data instead of the File object graph: the file summary and, for each message, its MessageType and a dict of
+    its converted field values. If parsing failed, error and error_traceback describe the failure.
+    """
+
+    summary_attributes = [
+        'type', 'product', 'serial_number', 'device', 'time_created', 'utc_offset', 'start_time', 'end_time', 'sport_type', 'sub_sport_type',
+        'last_message_timestamp', 'record_count'
+    ]
+
+    def __init__(self, filename):
+        """Return a ParseResult instance for the named file."""
+        self.filename = filename
+        self.messages = []
+        self.error = None
+        self.error_traceback = None
+        for attribute in self.summary_attributes:
+            setattr(self, attribute, None)
+
+    @classmethod
+    def from_file(cls, fit_file):
+        """Return a ParseResult instance holding the data from a File instance."""
+        result = cls(fit_file.filename)
+        for attribute in cls.summary_attributes:
+            setattr(result, attribute, getattr(fit_file, attribute))
+        result.messages = [(message.type, dict(message.fields)) for message in fit_file.messages]
+        return result
+
+    @classmethod
+    def from_exception(cls, filename, exception):
+        """Return a ParseResult instance for a file that failed to parse."""
+        result = cls(filename)
+        result.error = f'{exception.__class__.__name__}: {exception}'
+        result.error_traceback = traceback.format_exc()
+        return result
+
+    @property
+    def ok(self):
+        """Return if the file was parsed successfully."""
+        return self.error is None
+
+    def __getitem__(self, message_type):
+        """Return a list of the fields dicts of the messages of the given MessageType."""
+        return [fields for fields_message_type, fields in self.messages if fields_message_type == message_type]
+
+    def __str__(self):
+        """Return a string representation of a ParseResult instance."""
+        if self.error is not None:
+            return f'{self.__class__.__name__}({self.filename} failed: {self.error})'
+        return f'{self.__class__.__name__}({self.filename} {repr(self.type)} {len(self.messages)} messages)'
+
+    def __repr__(self):
+        """Return a string representation of a ParseResult instance."""
+        return self.__str__()
+
+
+def _parse(filename, measurement_system, message_types):
+    """Parse one FIT file in a worker process, returning a ParseResult."""
+    try:
+        return ParseResult.from_file(File(filename, measurement_system, mmap=True, message_types=message_types))
+    except Exception as e:
+        logger.error("Failed to parse %s: %s", filename, e)
+        return ParseResult.from_exception(filename, e)
+
+
+def parse_many(filenames, workers=None, ordered=True, measurement_system=DisplayMeasure.metric, message_types=None, chunksize=1):
+    """
+    Parse FIT files in parallel in a pool of worker processes and yield a ParseResult for each file.
+
+    Errors are captured per file in the file's ParseResult instead of being raised.
+
+    Parameters:
+    ----------
+        filenames (iterable): The names of the FIT files including full path.
+        workers (int): The number of worker processes, the number of CPUs if not given.
+        ordered (bool): Yield results in the order of filenames if True, else yield results as the files are completed.
+        measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to use when parsing the FIT files.
+        message_types (collection): If given, only decode messages of these MessageTypes and the messages needed for the file summaries.
+        chunksize (int): The number of files sent to a worker at a time when results are ordered.
+
+    """
+    filenames = list(filenames)
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    try:
+        if ordered:
+            yield from executor.map(_parse, filenames, itertools.repeat(measurement_system), itertools.repeat(message_types), chunksize=chunksize)
+        else:
+            futures = [executor.submit(_parse, filename, measurement_system, message_types) for filename in filenames]
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+    finally:
+        # If the caller stops iterating early, don't parse the files that haven't been started.
+        executor.shutdown(wait=True, cancel_futures=True)
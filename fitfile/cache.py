@@ -0,0 +1,120 @@
+"""Code that caches parsed FIT files on disk so that unchanged files don't have to be parsed again."""
+
+__author__ = "Tom Goetz"
+__copyright__ = "Copyright Tom Goetz"
+__license__ = "GPL"
+
+
+import os
+import logging
+import hashlib
+import pickle
+import tempfile
+
+from .version_info import __version__
+
+
+logger = logging.getLogger(__name__)
+
+
+class ParseCache():
+    """
+    A directory of parsed FIT files keyed by a hash of the file contents, the library version, and the parse options.
+
+    Entries are pickled, so the cache directory should only be writable by trusted users. The cache is bounded in size: when an entry is
+    stored, the least recently used entries are removed until the total size of the entries is under the limit.
+    """
+
+    default_max_size = 256 * 1024 * 1024
+    entry_extension = '.pickle'
+
+    def __init__(self, cache_dir, max_size=default_max_size):
+        """
+        Return a ParseCache instance.
+
+        Parameters:
+        ----------
+            cache_dir (string): The directory to store cache entries in, it's created if it doesn't exist.
+            max_size (int): The maximum total size of the cache entries in bytes.
+
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def key(cls, buffer, profile_version, *options):
+        """Return the cache key for the contents of a FIT file, the FIT profile version it was written with, and the options it's parsed with."""
+        content_hash = hashlib.sha256(buffer).hexdigest()
+        options_hash = hashlib.sha256(repr((__version__, profile_version) + options).encode()).hexdigest()
+        return f'{content_hash}-{options_hash[:16]}'
+
+    def __path(self, key):
+        return os.path.join(self.cache_dir, key + self.entry_extension)
+
+    def load(self, key):
+        """Return the data cached for a key or None if it isn't in the cache."""
+        path = self.__path(key)
+        try:
+            with open(path, 'rb') as file:
+                data = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Removing unreadable cache entry %s: %s", path, e)
+            self.__remove(path)
+            return None
+        # The modification time records when an entry was last used. The entry may have been evicted since it was read or the cache may be
+        # read only, either way the data that was read is still good.
+        try:
+            os.utime(path)
+        except OSError as e:
+            logger.debug("Couldn't update the last use time of cache entry %s: %s", path, e)
+        logger.debug("Loaded %s from the cache", key)
+        return data
+
+    def store(self, key, data):
+        """Store data in the cache under a key and evict least recently used entries if the cache is too big."""
+        (fd, temp_path) = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.__path(key))
+        except Exception:
+            self.__remove(temp_path)
+            raise
+        logger.debug("Stored %s in the cache", key)
+        self.evict()
+
+    def __entries(self):
+        entries = []
+        with os.scandir(self.cache_dir) as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.name.endswith(self.entry_extension):
+                    try:
+                        stat = dir_entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+        return entries
+
+    def __remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def size(self):
+        """Return the total size of the cache entries in bytes."""
+        return sum(size for (_, size, _) in self.__entries())
+
+    def evict(self):
+        """Remove the least recently used cache entries until the total size of the entries is no more than the maximum size."""
+        entries = sorted(self.__entries())
+        total_size = sum(size for (_, size, _) in entries)
+        for (_, size, path) in entries:
+            if total_size <= self.max_size:
+                break
+            logger.debug("Evicting %s from the cache", path)
+            self.__remove(path)
+            total_size -= size
@@ -0,0 +1,210 @@
+"""Code that exports the data messages of a FIT file as columns of NumPy arrays."""
+
+__author__ = "Tom Goetz"
+__copyright__ = "Copyright Tom Goetz"
+__license__ = "GPL"
+
+
+from .conversions.conversions import fit_epoch_unix_seconds
+from .fields import Field, TimestampField, sequence_types
+from .type_fields import TypeField, BoolField
+from .object_fields import ObjectField
+from .data_message import RawDataMessage
+from .field_enums import DisplayMeasure, TimestampMode
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+_timestamp_field = TimestampField(name='timestamp')
+
+
+def _is_linear(field):
+    """Return if a field's conversion from raw values is a linear scale and offset that can be applied to a whole column at once."""
+    if isinstance(field, ObjectField):
+        return True
+    if isinstance(field, BoolField):
+        return False
+    return field.value_names() == [field.name] and type(field)._convert_single in (Field._convert_single, TypeField._convert_single)
+
+
+def _linear_column(field, raw, measurement_system):
+    """Apply a field's scale and offset to a column of raw values the same way that the field converts a single value."""
+    if isinstance(field, ObjectField):
+        (scale, offset) = field.linear_conversion(measurement_system)
+        return (raw / scale) + offset
+    return (raw / field._scale) + field._offset
+
+
+def _timestamp_column(raw):
+    return (raw + fit_epoch_unix_seconds).astype('datetime64[s]')
+
+
+def _object_column(name, field, raw_values, invalids, measurement_system):
+    """Convert a column one value at a time for fields whose conversion isn't linear."""
+    column = numpy.empty(len(raw_values), dtype=object)
+    for index, (raw, invalid) in enumerate(zip(raw_values, invalids)):
+        if raw is not None:
+            for field_value in field.convert(raw, invalid, measurement_system):
+                if name in field_value:
+                    column[index] = field_value[name]
+    return column
+
+
+def _column(name, field, raw_values, invalids, measurement_system):
+    missing = numpy.array([raw is None for raw in raw_values], dtype=bool)
+    if any(isinstance(raw, sequence_types + (bytes,)) for raw in raw_values):
+        return numpy.ma.masked_array(_object_column(name, field, raw_values, invalids, measurement_system), mask=missing)
+    mask = missing | numpy.array([raw == invalid for raw, invalid in zip(raw_values, invalids)], dtype=bool)
+    if isinstance(field, TimestampField):
+        raw = numpy.array([0 if raw is None else raw for raw in raw_values], dtype=numpy.int64)
+        return numpy.ma.masked_array(_timestamp_column(raw), mask=mask)
+    if _is_linear(field):
+        raw = numpy.array([0 if raw is None else raw for raw in raw_values], dtype=numpy.float64)
+        return numpy.ma.masked_array(_linear_column(field, raw, measurement_system), mask=mask)
+    return numpy.ma.masked_array(_object_column(name, field, raw_values, invalids, measurement_system), mask=mask)
+
+
+def _grouped_column(name, row_fields, raw_values, invalids, measurement_system):
+    """Build a column from rows that may be converted by different fields, i.e. dependant fields resolved differently per message."""
+    fields = list({id(field): field for field in row_fields if field is not None}.values())
+    if not fields:
+        return None
+    if len(fields) == 1:
+        return _column(name, fields[0], raw_values, invalids, measurement_system)
+    column = None
+    for field in fields:
+        group_raw_values = [raw if row_field is field else None for raw, row_field in zip(raw_values, row_fields)]
+        group_column = _column(name, field, group_raw_values, invalids, measurement_system)
+        column = group_column if column is None else numpy.ma.where(numpy.ma.getmaskarray(group_column), column, group_column)
+    return column
+
+
+def _converted_column(name, messages, rows, column=None):
+    """Fill in the rows of a column from the messages' converted values for values that can't be converted from the raw values."""
+    values = [message.fields.get(name) if row else None for message, row in zip(messages, rows)]
+    mask = [value is None for value in values]
+    if column is None:
+        numeric = all(type(value) in (int, float) for value in values if value is not None)
+        column = numpy.ma.masked_all(len(values), dtype=numpy.float64 if numeric else object)
+    try:
+        converted = numpy.ma.masked_array([column.dtype.type() if value is None else value for value in values], mask=mask, dtype=column.dtype)
+    except (TypeError, ValueError):
+        converted = numpy.ma.masked_array(numpy.empty(len(values), dtype=object), mask=mask)
+        converted[:] = values
+    return numpy.ma.where(mask, column, converted)
+
+
+def _control_value(message, name, measurement_system):
+    """Return the converted value of a field that controls how a dependant field is converted."""
+    raw_value = message.raw_value(name)
+    if raw_value is not None:
+        (field, raw, invalid) = raw_value
+        for field_value in field.convert(raw, invalid, measurement_system):
+            if name in field_value:
+                return field_value[name]
+    return None
+
+
+def _dependant_values(message, dependant_fields, measurement_system):
+    """
+    Return a dict of the names of the values of a message's resolved dependant fields and tuples of the base field name, resolved Field,
+    raw value, and invalid value.
+    """
+    definition_message = message._definition_message
+    if id(definition_message) not in dependant_fields:
+        dependant_fields[id(definition_message)] = [
+            name for name in definition_message.field_names() if definition_message.named_field(name)[2]._dependant_field_control_fields
+        ]
+    values = {}
+    for name in dependant_fields[id(definition_message)]:
+        (field, raw, invalid) = message.raw_value(name)
+        control_values = [_control_value(message, control_field, measurement_system) for control_field in field._dependant_field_control_fields]
+        dependant_field = field.resolve_dependant_field(control_values)
+        for value_name in dependant_field.value_names():
+            values[value_name] = (name, dependant_field, raw, invalid)
+    return values
+
+
+def _field_names(messages, dependant_values):
+    """Return the names of the fields found in the messages with dependant fields named by the fields they resolved to."""
+    field_names = []
+    seen = set()
+    for message, message_dependant_values in zip(messages, dependant_values):
+        key = (id(message._definition_message), tuple(message_dependant_values))
+        if key in seen:
+            continue
+        seen.add(key)
+        for name in message._definition_message.field_names():
+            names = [value_name for value_name, (base_name, _, _, _) in message_dependant_values.items() if base_name == name] or [name]
+            field_names += [name for name in names if name not in field_names]
+    return field_names
+
+
+def _message_timestamp(message, timestamp_mode):
+    """Return the timestamp of a message without a timestamp field, i.e. one derived from a timestamp_16 field, in FIT epoch seconds."""
+    timestamp = message.fields.timestamp
+    # Raw messages hold FIT epoch seconds whatever the timestamp mode is.
+    if timestamp is None or timestamp_mode is TimestampMode.fit_seconds or isinstance(message, RawDataMessage):
+        return timestamp
+    if timestamp_mode is TimestampMode.unix_seconds:
+        return timestamp - fit_epoch_unix_seconds
+    return int(timestamp.timestamp()) - fit_epoch_unix_seconds
+
+
+def to_columns(messages, field_names=None, measurement_system=DisplayMeasure.metric, timestamp_mode=TimestampMode.datetime):
+    """
+    Return a dictionary of NumPy masked arrays, one per field, holding the values of the fields of a list of data messages.
+
+    The columns are built from the raw decoded field values, not the converted per message values. Values that are invalid or that are
+    missing because a message's definition doesn't have the field are masked. Timestamps are returned as datetime64[s] values, positions in
+    degrees, and other fields in the units the field converts to for the measurement system. Fields whose conversion depends on other
+    fields, i.e. monitoring cycles that are steps or strokes depending on the activity type, are resolved per message and exported under
+    the names of the fields they resolve to. The base values of those fields, which don't have a raw value of their own, are taken from the
+    messages' converted values.
+
+    Parameters:
+    ----------
+        messages (list): The data messages, usually all of the messages of one MessageType.
+        field_names (list): The names of the fields to return columns for, all fields found in the messages if not given.
+        measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to convert the values to.
+        timestamp_mode (TimestampMode): The TimestampMode the messages were decoded with.
+
+    """
+    if numpy is None:
+        raise ImportError('NumPy is required to export FIT file messages as columns')
+    dependant_fields = {}
+    dependant_values = [_dependant_values(message, dependant_fields, measurement_system) for message in messages]
+    if field_names is None:
+        field_names = _field_names(messages, dependant_values)
+    columns = {}
+    for name in field_names:
+        row_fields = []
+        raw_values = []
+        invalids = []
+        converted_rows = []
+        for message, message_dependant_values in zip(messages, dependant_values):
+            raw_value = message.raw_value(name)
+            converted = False
+            if name in message_dependant_values:
+                (_, field, raw, invalid) = message_dependant_values[name]
+            elif raw_value is not None and not raw_value[0]._dependant_field_control_fields:
+                (field, raw, invalid) = raw_value
+            elif name == 'timestamp':
+                # Messages with timestamp_16 fields get their timestamp from the previous messages.
+                (field, raw, invalid) = (_timestamp_field, _message_timestamp(message, timestamp_mode), None)
+            else:
+                # The base value of a dependant field that resolved to a field with another name only has a converted value.
+                converted = raw_value is not None
+                (field, raw, invalid) = (None, None, None)
+            row_fields.append(field)
+            raw_values.append(raw)
+            invalids.append(invalid)
+            converted_rows.append(converted)
+        column = _grouped_column(name, row_fields, raw_values, invalids, measurement_system)
+        if any(converted_rows):
+            column = _converted_column(name, messages, converted_rows, column)
+        columns[name] = numpy.ma.masked_all(len(messages), dtype=object) if column is None else column
+    return columns
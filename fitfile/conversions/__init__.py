@@ -6,4 +6,4 @@ __license__ = "GPL"
 
 # flake8: noqa
 
-from .conversions import ms_to_dt_time, secs_to_dt_time, min_to_dt_time, hours_to_dt_time, time_to_secs, time_to_timedelta, timedelta_to_time, add_time, subtract_time, day_of_the_year_to_datetime, meters_to_feet, meters_to_miles, mps_to_mph, celsius_to_fahrenheit, date_to_dt, dt_to_epoch_ms, dt_to_utc_epoch_ms, printable, perhour_speed_to_pace
+from .conversions import ms_to_dt_time, secs_to_dt_time, min_to_dt_time, hours_to_dt_time, time_to_secs, time_to_timedelta, timedelta_to_time, add_time, subtract_time, day_of_the_year_to_datetime, meters_to_feet, meters_to_miles, mps_to_mph, celsius_to_fahrenheit, date_to_dt, dt_to_epoch_ms, dt_to_utc_epoch_ms, printable, perhour_speed_to_pace, fit_epoch, fit_epoch_local, fit_epoch_unix_seconds, fit_timestamp_to_datetime
@@ -9,6 +9,19 @@ import datetime
 import string
 
 
+# FIT timestamps are seconds since the FIT epoch, 1989-12-31 00:00:00 UTC.
+fit_epoch = datetime.datetime(1989, 12, 31, 0, 0, 0, tzinfo=datetime.timezone.utc)
+fit_epoch_local = datetime.datetime(1989, 12, 31, 0, 0, 0)
+fit_epoch_unix_seconds = 631065600
+
+
+def fit_timestamp_to_datetime(timestamp, utc=True):
+    """Convert a FIT timestamp to a datetime object, timezone aware if the timestamp is UTC."""
+    if utc:
+        return datetime.datetime.fromtimestamp(timestamp + fit_epoch_unix_seconds, datetime.timezone.utc)
+    return fit_epoch_local + datetime.timedelta(seconds=timestamp)
+
+
 def ms_to_dt_time(time_ms):
     """Convert time in milli seconds to a datetime object."""
     if time_ms is not None:
@@ -0,0 +1,46 @@
+"""Object that calculates the CRC used to check FIT file headers and data."""
+
+__author__ = "Tom Goetz"
+__copyright__ = "Copyright Tom Goetz"
+__license__ = "GPL"
+
+
+# The FIT SDK defines the CRC a nibble at a time.
+nibble_table = [
+    0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
+    0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400
+]
+
+
+def _nibble_update(crc, byte):
+    crc = ((crc >> 4) & 0x0FFF) ^ nibble_table[crc & 0xF] ^ nibble_table[byte & 0xF]
+    return ((crc >> 4) & 0x0FFF) ^ nibble_table[crc & 0xF] ^ nibble_table[(byte >> 4) & 0xF]
+
+
+# Updating the CRC a byte at a time takes half the table lookups of a nibble at a time.
+byte_table = [_nibble_update(0, byte) for byte in range(256)]
+
+
+class Crc():
+    """Calculate the FIT file CRC-16 incrementally as data is parsed."""
+
+    def __init__(self, crc=0):
+        """Return a Crc instance with the given starting value."""
+        self.value = crc
+
+    def update(self, data):
+        """Update the CRC with the bytes in data (bytes, bytearray, or memoryview) and return the updated CRC."""
+        crc = self.value
+        for byte in data:
+            crc = (crc >> 8) ^ byte_table[(crc ^ byte) & 0xFF]
+        self.value = crc
+        return crc
+
+    @classmethod
+    def calculate(cls, data):
+        """Return the CRC of the bytes in data."""
+        return cls().update(data)
+
+    def __repr__(self):
+        """Return a string representation of a Crc instance."""
+        return f'{self.__class__.__name__}(0x{self.value:04x})'
@@ -7,6 +7,7 @@ __license__ = "GPL"
 import struct
 import logging
 import enum
+import array
 
 
 logger = logging.getLogger(__name__)
@@ -33,10 +34,10 @@ class Schema():
         'INT64': 8,
         'UINT64': 8,
         'FLOAT32': 4,
-        'FLOAT64': 4
+        'FLOAT64': 8
     }
 
-    __type_to_unpack_format = {
+    type_to_unpack_format = {
         'CHAR': 'B',
         'INT8': 'b',
         'UINT8': 'B',
@@ -50,29 +51,49 @@ class Schema():
         'FLOAT64': 'd'
     }
 
+    # The item sizes of the 'i' and 'l' array typecodes vary by platform.
+    type_to_array_typecode = {
+        'CHAR': 'B',
+        'INT8': 'b',
+        'UINT8': 'B',
+        'INT16': 'h',
+        'UINT16': 'H',
+        'INT32': 'i' if array.array('i').itemsize == 4 else 'l',
+        'UINT32': 'I' if array.array('I').itemsize == 4 else 'L',
+        'INT64': 'q',
+        'UINT64': 'Q',
+        'FLOAT32': 'f',
+        'FLOAT64': 'd'
+    }
+
     def __init__(self, name, ordered_dict):
         """Return a message schema given it's name and an ordered dict of its fields."""
         self.name = name
         self.ordered_dict = ordered_dict
-        self.file_size = [0, 0]
-        self.unpack_format = [None, None]
+        # Compile the formats for both byte orders up front so that schemas shared by files parsed on different threads are never modified.
+        compiled = [self.__compile_unpack(endian) for endian in Architecture]
+        self.unpack_format = [unpack_format for unpack_format, _ in compiled]
+        self.file_size = [file_size for _, file_size in compiled]
 
     def __compile_unpack(self, endian):
-        if endian is Architecture.Big_Endian:
-            unpack_format = '>'
-        else:
-            unpack_format = ''
+        unpack_format = self.endian_format(endian)
+        file_size = 0
         for key in self.ordered_dict:
             (type, count) = self.ordered_dict[key]
             for _ in range(count):
-                unpack_format += self.__type_to_unpack_format[type]
-                self.file_size[endian.value] += self.type_to_size[type]
-        self.unpack_format[endian.value] = unpack_format
+                unpack_format += self.type_to_unpack_format[type]
+                file_size += self.type_to_size[type]
+        return (unpack_format, file_size)
+
+    @classmethod
+    def endian_format(cls, endian):
+        """Return the struct byte order prefix for the given endian type."""
+        if endian is Architecture.Big_Endian:
+            return '>'
+        return '<'
 
     def get_unpack(self, endian):
         """Get a compiled unpack format for this schema."""
-        if self.unpack_format[endian.value] is None:
-            self.__compile_unpack(endian)
         return (self.unpack_format[endian.value], self.file_size[endian.value])
 
     def _decode(self, data):
@@ -92,30 +113,34 @@ class Schema():
 class Data():
     """The base object for decoding FIT file data."""
 
-    def __init__(self, file, primary_schema, secondary_schemas=None, endian=Architecture.Little_Endian):
-        """Return a Data instance created by parsing data from a FIT file."""
-        self.file = file
+    def __init__(self, buffer, offset, primary_schema, secondary_schemas=None, endian=Architecture.Little_Endian):
+        """Return a Data instance created by parsing data from a buffer holding FIT file data starting at offset."""
+        self.offset = offset
         self.primary_schema = primary_schema
         self.secondary_schemas = secondary_schemas
         self.endian = endian
         self.file_size = 0
-        self.decode_all()
+        self.decode_all(buffer)
         self._convert()
 
-    def _decode(self, schema):
-        """Given a schema decode file data into fields and add them as properties of the data object."""
+    def _decode(self, buffer, schema):
+        """Given a schema decode buffer data into fields and add them as properties of the data object."""
         (unpack_format, file_size) = schema.get_unpack(self.endian)
+        bytes = struct.unpack_from(unpack_format, buffer, self.offset + self.file_size)
         self.file_size += file_size
-        bytes = struct.unpack(unpack_format, self.file.read(file_size))
         vars(self).update(schema._decode(bytes))
 
-    def decode_all(self):
-        """Decode file data using all of the data objects schemas."""
-        self._decode(self.primary_schema)
+    def decode_all(self, buffer):
+        """Decode buffer data using all of the data objects schemas."""
+        self._decode(buffer, self.primary_schema)
         if self.secondary_schemas is not None:
             for schema, control_func in self.secondary_schemas:
                 if control_func():
-                    self._decode(schema)
+                    self._decode(buffer, schema)
 
     def _convert(self):
         pass
+
+    def __getstate__(self):
+        """Return the decoded values of a Data instance for pickling, leaving out the schemas used to decode them."""
+        return {name: value for name, value in vars(self).items() if name not in ('primary_schema', 'secondary_schemas')}
@@ -5,37 +5,21 @@ __copyright__ = "Copyright Tom Goetz"
 __license__ = "GPL"
 
 
-import collections
-
-from .data import Data, Schema
 from .exceptions import FitDataFieldParse
 
 
-class DataField(Data):
+class DataField():
     """FIT file data field."""
 
-    field_value = None
-    __schema_cache = {}
+    __slots__ = ('field_definition', 'measurement_system', 'field', 'field_value', 'values')
 
-    def __init__(self, file, definition_message, field_definition, measurement_system):
-        """Return an instance of the DataField class."""
-        self.field_definition = field_definition
+    def __init__(self, definition_message, index, field_value, measurement_system):
+        """Return an instance of the DataField class given the index of the field in the definition message and the raw value decoded for it."""
+        self.field_definition = definition_message.field_definitions[index]
         self.measurement_system = measurement_system
-        self.field = definition_message.field(field_definition.field_definition_number)
-        schema = self.__get_schema(field_definition.type_string(), field_definition.type_count())
-        super().__init__(file, schema, None, definition_message.endian)
-
-    def __populate_schema_cache(self, schema_sig, type, count):
-        """Cache schema on the assumption that the set of schemas is much smaller than the number of times they are used."""
-        schema = Schema(schema_sig, collections.OrderedDict([('field_value', [type, count])]))
-        self.__schema_cache[schema_sig] = schema
-        return schema
-
-    def __get_schema(self, type, count):
-        schema_sig = f'{type}_{count}'
-        if schema_sig in self.__schema_cache:
-            return self.__schema_cache[schema_sig]
-        return self.__populate_schema_cache(schema_sig, type, count)
+        self.field = definition_message.resolved_fields[index]
+        self.field_value = field_value
+        self._convert()
 
     def _convert(self):
         try:
@@ -7,10 +7,15 @@ __license__ = "GPL"
 
 import logging
 import datetime
+import itertools
+import collections.abc
 
+from .conversions.conversions import fit_epoch, fit_epoch_unix_seconds, fit_timestamp_to_datetime
+from .field_enums import TimestampMode
+from .fields import TimestampField
+from .field_value import FieldValue
 from .data_field import DataField
-from .dev_data_field import DevDataField
-from .exceptions import FitMessageParse
+from .exceptions import FitMessageParse, FitDataFieldParse
 
 
 logger = logging.getLogger(__name__)
@@ -19,6 +24,8 @@ logger = logging.getLogger(__name__)
 class MessageFields(dict):
     """Class holds field names and values."""
 
+    __slots__ = ()
+
     def __getattr__(self, name):
         return self.get(name)
 
@@ -26,97 +33,175 @@ class MessageFields(dict):
 class DataMessageDecodeContext():
     """Class that holds data used across decoding of all DataMessages."""
 
-    def __init__(self):
-        """Return a DataMessageDecodeContext instance."""
-        self.matched_timestamp_16 = None
-        self.last_timestamp = None
-        self.last_absolute_timestamp = None
+    fit_epoch = fit_epoch
+    timestamp_16_mask = 0xffff
+    compressed_timestamp_mask = 0x1f
+
+    def __init__(self, timestamp_mode=TimestampMode.datetime):
+        """Return a DataMessageDecodeContext instance that returns timestamps resolved from relative timestamps as the TimestampMode specifies."""
+        # Timestamps are tracked as seconds since the FIT epoch and only converted to datetimes when needed.
+        self.timestamp_mode = timestamp_mode
+        self.first_timestamp_seconds = None
+        self.last_timestamp_seconds = None
+
+    @classmethod
+    def __datetime(cls, timestamp_seconds):
+        if timestamp_seconds is not None:
+            return fit_timestamp_to_datetime(timestamp_seconds)
+        return None
+
+    def timestamp(self, timestamp_seconds):
+        """Return a timestamp in seconds since the FIT epoch as the TimestampMode specifies."""
+        if timestamp_seconds is None or self.timestamp_mode is TimestampMode.fit_seconds:
+            return timestamp_seconds
+        if self.timestamp_mode is TimestampMode.unix_seconds:
+            return timestamp_seconds + fit_epoch_unix_seconds
+        return fit_timestamp_to_datetime(timestamp_seconds)
+
+    @property
+    def first_timestamp(self):
+        """Return the first timestamp decoded as a datetime."""
+        return self.__datetime(self.first_timestamp_seconds)
+
+    @property
+    def last_timestamp(self):
+        """Return the last timestamp decoded as a datetime."""
+        return self.__datetime(self.last_timestamp_seconds)
 
     def absolute_timestamp(self, absolute_timestamp):
         """Update the context given an absolute timestamp."""
-        self.last_timestamp = absolute_timestamp
-        self.last_absolute_timestamp = absolute_timestamp
-        self.matched_timestamp_16 = None
+        self.absolute_timestamp_seconds(int((absolute_timestamp.replace(tzinfo=datetime.timezone.utc) - self.fit_epoch).total_seconds()))
+
+    def absolute_timestamp_seconds(self, timestamp_seconds):
+        """Update the context given an absolute timestamp in seconds since the FIT epoch."""
+        if self.first_timestamp_seconds is None:
+            self.first_timestamp_seconds = timestamp_seconds
+        self.last_timestamp_seconds = timestamp_seconds
+
+    def __relative_timestamp(self, relative_timestamp, mask):
+        # A relative timestamp holds the least significant bits of the timestamp, roll over into the more significant bits.
+        if self.last_timestamp_seconds is None:
+            logger.error('Relative timestamp %d before any absolute timestamp', relative_timestamp)
+            return None
+        self.last_timestamp_seconds += (relative_timestamp - self.last_timestamp_seconds) & mask
+        return self.timestamp(self.last_timestamp_seconds)
 
     def timestamp16_to_timestamp(self, timestamp_16):
         """Calculate an absolute timestamp given a relative timestamp16."""
-        if self.matched_timestamp_16:
-            if timestamp_16 >= self.matched_timestamp_16:
-                delta = timestamp_16 - self.matched_timestamp_16
-            else:
-                delta = (self.matched_timestamp_16 - 65535) + timestamp_16
-        else:
-            self.matched_timestamp_16 = timestamp_16
-            delta = 0
-        self.last_timestamp = self.last_absolute_timestamp + datetime.timedelta(seconds=delta)
-        return self.last_timestamp
+        return self.__relative_timestamp(timestamp_16, self.timestamp_16_mask)
+
+    def compressed_timestamp(self, time_offset):
+        """Calculate an absolute timestamp given the time offset from a compressed timestamp record header."""
+        return self.__relative_timestamp(time_offset, self.compressed_timestamp_mask)
 
 
 class DataMessage():
     """Class decodes and holds a FIT file data message."""
 
-    def __init__(self, definition_message, fit_file, measurement_system, context):
-        """Return a DataMessage instance decoded from the supplied FIT file using the supplied definition message."""
-        self.__definition_message = definition_message
-        self.__context = context
-        self.fields = MessageFields()
-        self.field_values = MessageFields()
-        self.file_size = 0
+    # A parsed file holds one instance per data message, so they're slotted to keep them small.
+    __slots__ = ('_definition_message', '_raw_field_values', '_raw_dev_field_values', 'fields', 'field_values')
+
+    def __init__(self, definition_message, buffer, offset, measurement_system, context, time_offset=None):
+        """
+        Return a DataMessage instance decoded from offset in the supplied FIT file buffer using the supplied definition message.
+
+        The time_offset is the time offset from the message's record header if it was a compressed timestamp header.
+        """
+        self._definition_message = definition_message
+        (field_values, dev_field_values) = definition_message.decode(buffer, offset)
+        self._raw_field_values = field_values
+        self._raw_dev_field_values = dev_field_values
+        self._decode_fields(field_values, dev_field_values, measurement_system)
+        self._track_time(context, time_offset)
+
+    def _decode_fields(self, field_values, dev_field_values, measurement_system):
+        (self.fields, self.field_values) = self._convert_fields(field_values, dev_field_values, measurement_system)
+
+    def _convert_fields(self, field_values, dev_field_values, measurement_system):
+        """Convert the raw field values of the message and return a tuple of the fields and field_values MessageFields."""
+        fields = MessageFields()
+        converted_field_values = MessageFields()
         message_fields = {}
-        for index in range(definition_message.fields):
+        for index in range(len(self._definition_message.field_definitions)):
             try:
-                data_field = DataField(fit_file, definition_message, definition_message.field_definitions[index], measurement_system)
+                data_field = DataField(self._definition_message, index, field_values[index], measurement_system)
             except Exception as e:
-                raise FitMessageParse(self, e)
-            self.file_size += data_field.file_size
+                raise self._parse_error(e)
             for field_value in data_field.values:
                 message_fields[field_value.field.name] = field_value
-        self.__convert_fields(message_fields, measurement_system)
-        self.__convert_dev_fields(fit_file, measurement_system)
-        self.__track_time()
-
-    def __add_field(self, field_value):
-        field_name = field_value.field.name.lower()
-        self.fields.update(field_value)
-        self.field_values[field_name] = field_value
-
-    def __control_field_value(self, field, message_fields, control_field_name):
-        if control_field_name in message_fields:
-            return message_fields[control_field_name].first()
-
-    def __convert_fields(self, message_fields, measurement_system):
         for field_value in message_fields.values():
             field = field_value.field
             if field._dependant_field_control_fields:
-                control_values = [self.__control_field_value(field, message_fields, control_field) for control_field in field._dependant_field_control_fields]
-                field_value.field = field.dependant_field(control_values)
+                control_values = [self.__control_field_value(message_fields, control_field) for control_field in field._dependant_field_control_fields]
+                field_value.field = field.resolve_dependant_field(control_values)
                 field_value.reconvert(measurement_system)
-            self.__add_field(field_value)
+            self.__add_field(fields, converted_field_values, field_value)
+        for (field, invalid), dev_field_value in zip(self._definition_message.resolved_dev_fields, dev_field_values):
+            self.__add_field(fields, converted_field_values, field.convert(dev_field_value, invalid, measurement_system)[0])
+        return (fields, converted_field_values)
 
-    def __convert_dev_fields(self, fit_file, measurement_system):
-        if self.__definition_message.has_dev_fields:
-            for index in range(self.__definition_message.dev_fields):
-                dev_data_field = DevDataField(fit_file, self.__definition_message, self.__definition_message.dev_field_definitions[index], measurement_system)
-                self.file_size += dev_data_field.file_size
-                self.__add_field(dev_data_field.value)
+    @classmethod
+    def __add_field(cls, fields, field_values, field_value):
+        fields.update(field_value)
+        field_values[field_value.field.name.lower()] = field_value
 
-    def __track_time(self):
-        if 'timestamp' in self.fields:
-            self.__context.absolute_timestamp(self.fields.timestamp)
-        elif 'timestamp_16' in self.fields:
+    @classmethod
+    def __control_field_value(cls, message_fields, control_field_name):
+        if control_field_name in message_fields:
+            return message_fields[control_field_name].first()
+
+    def _add_timestamp(self, timestamp):
+        self.fields['timestamp'] = timestamp
+
+    def _track_time(self, context, time_offset):
+        # Check the definition for the timestamp fields so that fields that are converted on demand aren't all converted here.
+        named_field = self._definition_message.named_field('timestamp')
+        if named_field is not None:
+            (_, raw_timestamp, _) = self.raw_value('timestamp')
+            if isinstance(named_field[2], TimestampField) and isinstance(raw_timestamp, int):
+                context.absolute_timestamp_seconds(raw_timestamp)
+            else:
+                context.absolute_timestamp(self.fields.timestamp)
+        elif time_offset is not None:
+            self._add_timestamp(context.compressed_timestamp(time_offset))
+        elif self._definition_message.named_field('timestamp_16') is not None:
             timestamp_16 = self.fields.timestamp_16
             if timestamp_16 is not None:
-                self.fields['timestamp'] = self.__context.timestamp16_to_timestamp(timestamp_16)
+                self._add_timestamp(context.timestamp16_to_timestamp(timestamp_16))
             else:
                 # This should not happen, if the timestamp16 field exists, it should not be None
                 # Issue #21: seen on Ubuntu on Windows
                 logger.error('timestamp16 with value None: %r', self.fields)
-                self.fields.add('timestamp', self.__context.last_timestamp)
+                self._add_timestamp(context.timestamp(context.last_timestamp_seconds))
+
+    def raw_value(self, name):
+        """Return a tuple of the Field instance, raw value, and invalid value of the named field or None if the message does not have the field."""
+        named_field = self._definition_message.named_field(name)
+        if named_field is not None:
+            (dev, index, field, invalid) = named_field
+            raw_values = self._raw_dev_field_values if dev else self._raw_field_values
+            return (field, raw_values[index], invalid)
+        return None
 
     @property
     def type(self):
         """Return the message type."""
-        return self.__definition_message.message_type
+        return self._definition_message.message_type
+
+    @property
+    def file_size(self):
+        """Return the size of the message's data in the FIT file."""
+        return self._definition_message.data_size
+
+    def _raw_repr(self):
+        """Return a string representation of the message's raw field values, which doesn't depend on converting the fields."""
+        raw_fields = dict(zip(self._definition_message.raw_field_names, itertools.chain(self._raw_field_values, self._raw_dev_field_values)))
+        return f'{self.__class__.__name__}({repr(self.type)}: raw {repr(raw_fields)})'
+
+    def _parse_error(self, exception):
+        """Return a FitMessageParse exception for an error converting the message's fields."""
+        # Describe the message by its raw values, repr() would try to convert the fields again.
+        return FitMessageParse(self._raw_repr(), exception)
 
     def __str__(self):
         """Return a string representation of a DataMessage instance."""
@@ -124,5 +209,313 @@ class DataMessage():
 
     def __repr__(self):
         """Return a string representation of a DataMessage instance."""
+        try:
+            field_values = list(self.field_values.values())
+        except (AttributeError, FitMessageParse):
+            # The fields haven't been converted yet or can't be converted.
+            return self._raw_repr()
         # we reformat the values with a list comprehension to avoid the .values() showing up as a generator in the repr output
-        return f'{self.__class__.__name__}({repr(self.type)}: {repr(list(self.field_values.values()))})'
+        return f'{self.__class__.__name__}({repr(self.type)}: {repr(field_values)})'
+
+
+class CachedDataMessage():
+    """Class that holds a data message restored from a parse cache: its message type and converted field values, but not its raw values."""
+
+    __slots__ = ('type', 'fields')
+
+    def __init__(self, message_type, fields):
+        """Return a CachedDataMessage instance given the message type and a dict of field names and values."""
+        self.type = message_type
+        self.fields = MessageFields(fields)
+
+    def raw_value(self, name):
+        """Return None, the raw values of a cached message aren't available."""
+        return None
+
+    def __str__(self):
+        """Return a string representation of a CachedDataMessage instance."""
+        return f'{self.__class__.__name__}: {repr(self.type)}: {str(self.fields)}'
+
+    def __repr__(self):
+        """Return a string representation of a CachedDataMessage instance."""
+        return f'{self.__class__.__name__}({repr(self.type)}: {repr(self.fields)})'
+
+
+class LazyMessageFields(collections.abc.Mapping):
+    """A read only view of the field names and values of a LazyDataMessage that converts fields the first time they are accessed."""
+
+    __slots__ = ('__data_message', '__converted_fields', '__field_values')
+
+    def __init__(self, data_message, converted_fields, field_values):
+        """Return a LazyMessageFields instance given the message, its dict of already converted fields, and if it's a view of the field values."""
+        self.__data_message = data_message
+        self.__converted_fields = converted_fields
+        self.__field_values = field_values
+
+    def __getitem__(self, name):
+        self.__data_message._convert_pending(name, self.__field_values)
+        return self.__converted_fields[name]
+
+    def __contains__(self, name):
+        return name in self.__converted_fields or self.__data_message._is_pending(name, self.__field_values)
+
+    def __iter__(self):
+        self.__data_message._convert_all()
+        return iter(self.__converted_fields)
+
+    def __len__(self):
+        self.__data_message._convert_all()
+        return len(self.__converted_fields)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.get(name)
+
+    def __repr__(self):
+        """Return a string representation of a LazyMessageFields instance."""
+        return repr(dict(self))
+
+
+class LazyDataMessage(DataMessage):
+    """
+    Class decodes a FIT file data message and holds its raw field values.
+
+    Fields are converted the first time they are accessed via fields or field_values and the converted values are cached. Fields that
+    depend on the values of other fields and the message's timestamp are converted when the message is decoded.
+    """
+
+    __slots__ = ('__measurement_system', '__fields', '__field_values', '__pending_fields')
+
+    def _decode_fields(self, field_values, dev_field_values, measurement_system):
+        self.__measurement_system = measurement_system
+        self.__fields = MessageFields()
+        self.__field_values = MessageFields()
+        self.__pending_fields = {}
+        dependant_fields = []
+        definition_message = self._definition_message
+        for field_definition, field, field_value in zip(definition_message.field_definitions, definition_message.resolved_fields, field_values):
+            pending_field = (field, field_value, field_definition.invalid())
+            if field._dependant_field_control_fields:
+                dependant_fields.append(pending_field)
+            else:
+                self.__add_pending(pending_field)
+        for (field, invalid), dev_field_value in zip(definition_message.resolved_dev_fields, dev_field_values):
+            self.__add_pending((field, dev_field_value, invalid))
+        for pending_field in dependant_fields:
+            self.__convert_dependant(pending_field)
+
+    def __add_pending(self, pending_field):
+        for key in self.__pending_keys(pending_field[0]):
+            self.__pending_fields[key] = pending_field
+
+    @classmethod
+    def __pending_keys(cls, field):
+        # Pending fields are keyed the same way as the views: by value name for the fields and by the lower case names of the fields of
+        # the FieldValues that converting the field produces for the field values.
+        return [(False, name) for name in field.value_names()] + [(True, name.lower()) for name in field.field_value_names()]
+
+    def __convert(self, pending_field):
+        (field, value, invalid) = pending_field
+        try:
+            return field.convert(value, invalid, self.__measurement_system)
+        except Exception as e:
+            raise self._parse_error(FitDataFieldParse(value, field, e))
+
+    def __add_field(self, field_value):
+        self.__fields.update(field_value)
+        self.__field_values[field_value.field.name.lower()] = field_value
+
+    def __control_field_value(self, control_field_name):
+        field_value = self.field_values.get(control_field_name)
+        if field_value is not None:
+            return field_value.first()
+
+    def __convert_dependant(self, pending_field):
+        field = pending_field[0]
+        control_values = [self.__control_field_value(control_field) for control_field in field._dependant_field_control_fields]
+        for field_value in self.__convert(pending_field):
+            field_value.field = field.resolve_dependant_field(control_values)
+            field_value.reconvert(self.__measurement_system)
+            self.__add_field(field_value)
+
+    def _is_pending(self, name, field_values=False):
+        return (field_values, name) in self.__pending_fields
+
+    def _convert_pending(self, name, field_values=False):
+        pending_field = self.__pending_fields.get((field_values, name))
+        if pending_field is not None:
+            # Convert before removing the field from the pending fields so that a field that fails to convert raises each time it's accessed.
+            converted_field_values = self.__convert(pending_field)
+            field = pending_field[0]
+            for key in self.__pending_keys(field):
+                if self.__pending_fields.get(key) is pending_field:
+                    del self.__pending_fields[key]
+            for field_value in converted_field_values:
+                self.__add_field(field_value)
+
+    def _convert_all(self):
+        while self.__pending_fields:
+            (field_values, name) = next(iter(self.__pending_fields))
+            self._convert_pending(name, field_values)
+
+    def _add_timestamp(self, timestamp):
+        self.__fields['timestamp'] = timestamp
+
+    @property
+    def fields(self):
+        """Return a mapping of field names to converted field values."""
+        return LazyMessageFields(self, self.__fields, False)
+
+    @property
+    def field_values(self):
+        """Return a mapping of field names to FieldValue instances."""
+        return LazyMessageFields(self, self.__field_values, True)
+
+
+class CompactMessageFields(collections.abc.Mapping):
+    """A read only view of the fields or field values of a CompactDataMessage that converts fields each time they are accessed."""
+
+    __slots__ = ('__data_message', '__field_values')
+
+    def __init__(self, data_message, field_values):
+        """Return a CompactMessageFields view of the message's FieldValue instances if field_values is True, else of its converted values."""
+        self.__data_message = data_message
+        self.__field_values = field_values
+
+    def __getitem__(self, name):
+        return self.__data_message._convert_field(name, self.__field_values)
+
+    def __contains__(self, name):
+        return self.__data_message._has_field(name, self.__field_values)
+
+    def __iter__(self):
+        return iter(self.__data_message._convert_all()[self.__field_values])
+
+    def __len__(self):
+        return len(self.__data_message._convert_all()[self.__field_values])
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.get(name)
+
+    def __repr__(self):
+        """Return a string representation of a CompactMessageFields instance."""
+        return repr(dict(self))
+
+
+class CompactDataMessage(DataMessage):
+    """
+    Class decodes a FIT file data message and stores only its raw field values.
+
+    Each value is stored once: the fields and field_values views convert fields each time they are accessed and don't keep the results.
+    Accessing a single field only converts that field unless its conversion depends on the values of other fields.
+    """
+
+    __slots__ = ('__measurement_system', '__timestamp')
+
+    def _decode_fields(self, field_values, dev_field_values, measurement_system):
+        self.__measurement_system = measurement_system
+        self.__timestamp = None
+
+    def __single_field(self, name, field_values):
+        """Return the definition's entry for a field that can be converted on its own or None."""
+        named_field = self._definition_message.named_field(name)
+        if named_field is not None:
+            field = named_field[2]
+            if not field._dependant_field_control_fields and (not field_values or field.name.lower() == name):
+                return named_field
+        return None
+
+    def _convert_field(self, name, field_values):
+        if name == 'timestamp' and not field_values and self.__timestamp is not None:
+            return self.__timestamp
+        named_field = self.__single_field(name, field_values)
+        if named_field is not None:
+            (dev, index, field, invalid) = named_field
+            value = (self._raw_dev_field_values if dev else self._raw_field_values)[index]
+            try:
+                converted_field_values = field.convert(value, invalid, self.__measurement_system)
+            except Exception as e:
+                raise self._parse_error(FitDataFieldParse(value, field, e))
+            for field_value in converted_field_values:
+                if field_values and field_value.field is field:
+                    return field_value
+                if not field_values and name in field_value:
+                    return field_value[name]
+        elif not field_values and not self._definition_message.has_dependant_fields:
+            raise KeyError(name)
+        # The views are indexed by field_values: 0 for the fields and 1 for the field values.
+        return self._convert_all()[field_values][name]
+
+    def _has_field(self, name, field_values):
+        if name == 'timestamp' and not field_values and self.__timestamp is not None:
+            return True
+        if self.__single_field(name, field_values) is not None:
+            return True
+        if not field_values and not self._definition_message.has_dependant_fields:
+            return False
+        return name in self._convert_all()[field_values]
+
+    def _convert_all(self):
+        """Convert all of the message's fields and return a tuple of the fields and field_values MessageFields."""
+        (fields, field_values) = self._convert_fields(self._raw_field_values, self._raw_dev_field_values, self.__measurement_system)
+        if self.__timestamp is not None:
+            fields['timestamp'] = self.__timestamp
+        return (fields, field_values)
+
+    def _add_timestamp(self, timestamp):
+        self.__timestamp = timestamp
+
+    @property
+    def fields(self):
+        """Return a mapping of field names to converted field values."""
+        return CompactMessageFields(self, False)
+
+    @property
+    def field_values(self):
+        """Return a mapping of field names to FieldValue instances."""
+        return CompactMessageFields(self, True)
+
+
+class RawDataMessage(DataMessage):
+    """
+    Class decodes a FIT file data message into the raw values of its fields without converting them.
+
+    The fields are the undecoded integers (semicircles, scaled values, enum values, etc) keyed by field name, including invalid values.
+    Fields whose conversion depends on other fields keep their base field's name. Timestamps are seconds since the FIT epoch, messages
+    with timestamp_16 fields or compressed timestamp headers get a timestamp field holding the resolved timestamp. The scale, offset,
+    units, and invalid value for converting each field are in field_info.
+    """
+
+    __slots__ = ()
+
+    def _decode_fields(self, field_values, dev_field_values, measurement_system):
+        self.fields = MessageFields(zip(self._definition_message.raw_field_names, itertools.chain(field_values, dev_field_values)))
+
+    def _track_time(self, context, time_offset):
+        if 'timestamp' in self.fields:
+            context.absolute_timestamp_seconds(self.fields['timestamp'])
+            return
+        if time_offset is not None:
+            context.compressed_timestamp(time_offset)
+        elif self.fields.get('timestamp_16') is not None:
+            context.timestamp16_to_timestamp(self.fields['timestamp_16'])
+        else:
+            return
+        self.fields['timestamp'] = context.last_timestamp_seconds
+
+    @property
+    def field_info(self):
+        """Return a mapping of field names to RawFieldInfo instances holding the scale, offset, units, and invalid value of the fields."""
+        return self._definition_message.raw_field_info
+
+    @property
+    def field_values(self):
+        """Return a mapping of field names to FieldValue instances holding the raw values."""
+        definition_message = self._definition_message
+        return MessageFields(
+            (name, FieldValue(definition_message.raw_fields[name], value, definition_message.raw_field_info[name].invalid, **{name: value}))
+            for name, value in self.fields.items() if name in definition_message.raw_fields
+        )
@@ -0,0 +1,372 @@
+"""Code that decodes the records of a FIT file into a stream of messages."""
+
+__author__ = "Tom Goetz"
+__copyright__ = "Copyright Tom Goetz"
+__license__ = "GPL"
+
+
+import logging
+import mmap
+import struct
+import collections
+
+from .file_header import FileHeader
+from .crc import Crc
+from .record_header import RecordHeader, MessageClass
+from .definition_message import DefinitionMessage
+from .developer_field_definition import DeveloperFieldDescription
+from .data_message import DataMessageDecodeContext, DataMessage, LazyDataMessage, CompactDataMessage, RawDataMessage
+from .message_type import MessageType
+from .field_enums import DisplayMeasure, TimestampMode
+from .exceptions import FitFileError
+
+
+logger = logging.getLogger(__name__)
+
+
+class Segment():
+    """Object that holds the metadata of one of the FIT files in a chained FIT file."""
+
+    def __init__(self, index, offset, file_header, first_message):
+        """
+        Return a Segment instance.
+
+        Parameters:
+        ----------
+            index (int): The position of the segment in the chain of FIT files, starting with 0.
+            offset (int): The offset of the segment's file header in the buffer.
+            file_header (FileHeader): The segment's file header.
+            first_message (int): The number of messages that were decoded from the segments before this one.
+
+        """
+        self.index = index
+        self.offset = offset
+        self.file_header = file_header
+        self.first_message = first_message
+        self.message_count = 0
+        self.record_count = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.header_crc_ok = None
+        self.file_crc_ok = None
+
+    @property
+    def file_size(self):
+        """Return the size of the segment including the file header and the file CRC."""
+        return self.file_header.file_size + self.file_header.data_size + Decoder.crc_size
+
+    def __repr__(self):
+        """Return a string representation of a Segment instance."""
+        return f'{self.__class__.__name__}({self.index} at {self.offset}: {self.message_count} messages, {self.record_count} records)'
+
+
+class Decoder():
+    """Decodes FIT file records into data messages keeping only the state needed to decode the following records."""
+
+    crc_size = struct.calcsize('<H')
+
+    def __init__(self, measurement_system=DisplayMeasure.metric, message_types=None, lazy=False, verify_crc=False, compact=False, raw=False,
+                 converted_message_types=None, timestamp_mode=TimestampMode.datetime):
+        """
+        Return a Decoder instance.
+
+        Parameters:
+        ----------
+            measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to use when decoding messages.
+            message_types (collection): If given, only data messages whose MessageType is in the collection are decoded, all others are skipped.
+            lazy (bool): Return LazyDataMessage instances that convert fields the first time they are accessed.
+            verify_crc (bool): Calculate the header and file CRCs as the records are decoded and check them against the CRCs in the file.
+            compact (bool): Return CompactDataMessage instances that store only raw field values and convert fields each time they are accessed.
+            raw (bool): Return RawDataMessage instances holding the raw field values without converting them.
+            converted_message_types (collection): Message types that are converted even if raw is set. field_description messages are
+                always converted since the developer fields are defined by their values.
+            timestamp_mode (TimestampMode): Return timestamps as datetimes or as integer FIT or Unix epoch seconds.
+
+        """
+        self.measurement_system = measurement_system
+        if compact:
+            self.converted_data_message_class = CompactDataMessage
+        else:
+            self.converted_data_message_class = LazyDataMessage if lazy else DataMessage
+        if raw:
+            self.data_message_class = RawDataMessage
+            self.converted_message_types = {MessageType.field_description} | set(converted_message_types or [])
+        else:
+            self.data_message_class = self.converted_data_message_class
+            self.converted_message_types = set()
+        self.message_types = set(message_types) if message_types is not None else None
+        self.verify_crc = verify_crc
+        self.timestamp_mode = timestamp_mode
+        self.segments = []
+        self.message_count = 0
+        self.message_type_counts = collections.Counter()
+        self.__new_segment_state()
+        # State for decoding data pushed a chunk at a time.
+        self.__pending = bytearray()
+        self.__stream_offset = 0
+        self.__segment = None
+        self.__segment_data_remaining = 0
+        self.__ignore_remaining = False
+
+    def __new_segment_state(self):
+        # Each FIT file in a chain of FIT files is decoded independently of the ones before it.
+        self.definition_messages = {}
+        self.dev_fields = {}
+        self.context = DataMessageDecodeContext(self.timestamp_mode)
+        self.crc = Crc() if self.verify_crc else None
+
+    def __start_segment(self, buffer, offset, stream_offset):
+        if self.segments:
+            self.__new_segment_state()
+        segment = Segment(len(self.segments), stream_offset, FileHeader(buffer, offset), self.message_count)
+        self.segments.append(segment)
+        if self.crc is not None:
+            self.__check_header_crc(buffer, offset, segment)
+        return segment
+
+    def __end_segment(self, buffer, offset, segment):
+        segment.first_timestamp = self.context.first_timestamp
+        segment.last_timestamp = self.context.last_timestamp
+        if self.crc is not None:
+            self.__check_file_crc(buffer, offset, segment)
+
+    def messages(self, buffer):
+        """Yield the data messages decoded from a buffer (bytes, bytearray, memoryview, mmap) holding a FIT file or a chain of FIT files."""
+        # Decode via offsets into a view of the data so that no copies are made, and release the view so that a mmap can be closed.
+        with memoryview(buffer) as buffer_view, buffer_view.cast('B') as byte_view:
+            offset = 0
+            while offset == 0 or self.__chained_file_follows(byte_view, offset):
+                segment = self.__start_segment(byte_view, offset, offset)
+                yield from self.__decode(byte_view, offset + segment.file_header.file_size, segment)
+                offset += segment.file_size
+
+    @classmethod
+    def __chained_file_follows(cls, buffer, offset):
+        remaining = len(buffer) - offset
+        if remaining <= 0:
+            return False
+        if remaining >= FileHeader.min_file_header_size and bytes(buffer[offset + 8:offset + 12]) == bytes(FileHeader.file_data_type):
+            return True
+        logger.warning("Ignoring %d bytes following the FIT file at %d", remaining, offset)
+        return False
+
+    def __check_header_crc(self, buffer, offset, segment):
+        file_header = segment.file_header
+        self.crc.update(buffer[offset:offset + FileHeader.min_file_header_size])
+        # A header CRC of 0 means that the header CRC wasn't calculated.
+        if file_header.file_size >= FileHeader.opt_file_header_size and file_header.crc != 0:
+            segment.header_crc_ok = self.crc.value == file_header.crc
+        self.crc.update(buffer[offset + FileHeader.min_file_header_size:offset + file_header.file_size])
+
+    def __check_file_crc(self, buffer, offset, segment):
+        if len(buffer) >= offset + self.crc_size:
+            (file_crc,) = struct.unpack_from('<H', buffer, offset)
+            segment.file_crc_ok = self.crc.value == file_crc
+        else:
+            logger.error("File is truncated, missing the file CRC")
+            segment.file_crc_ok = False
+
+    def __decode(self, buffer, offset, segment):
+        data_size = segment.file_header.data_size
+        data_consumed = 0
+        while data_size > data_consumed:
+            (record_size, data_message) = self.__decode_record(buffer, offset + data_consumed, segment)
+            data_consumed += record_size
+            if data_message is not None:
+                yield data_message
+            logger.debug("Record %d: consumed %d of %s %r", segment.record_count, data_consumed, data_size, self.measurement_system)
+        self.__end_segment(buffer, offset + data_consumed, segment)
+
+    def __decode_record(self, buffer, offset, segment):
+        """Decode the record at offset in the buffer and return a tuple of the size of the record and the data message to yield or None."""
+        record_header = RecordHeader(buffer, offset)
+        local_message_num = record_header.local_message()
+        record_size = record_header.file_size
+        data_message = None
+        segment.record_count += 1
+        logger.debug("Parsed record %r", record_header)
+        if record_header.message_class is MessageClass.definition:
+            definition_message = DefinitionMessage.get(record_header, self.dev_fields, buffer, offset + record_size, self.timestamp_mode)
+            logger.debug("  Definition [%d]: %s", local_message_num, definition_message)
+            record_size += definition_message.file_size
+            self.definition_messages[local_message_num] = definition_message
+        else:
+            definition_message = self.definition_messages[local_message_num]
+            message_type = definition_message.message_type
+            self.message_type_counts[message_type] += 1
+            wanted = self.message_types is None or message_type in self.message_types
+            if wanted or message_type == MessageType.field_description:
+                if message_type in self.converted_message_types:
+                    data_message_class = self.converted_data_message_class
+                else:
+                    data_message_class = self.data_message_class
+                decoded_message = data_message_class(definition_message, buffer, offset + record_size, self.measurement_system, self.context,
+                                                     record_header.time_offset())
+                logger.debug("  Data [%d]: %s", local_message_num, decoded_message)
+                if message_type == MessageType.field_description:
+                    dev_field_description = DeveloperFieldDescription(decoded_message)
+                    self.dev_fields[DeveloperFieldDescription.key(dev_field_description.developer_data_index, dev_field_description.field_number)] = \
+                        dev_field_description
+                if wanted:
+                    segment.message_count += 1
+                    self.message_count += 1
+                    data_message = decoded_message
+            elif record_header.compressed_timestamp():
+                # Skip over the message, only tracking time so that relative timestamps in later messages resolve correctly.
+                self.context.compressed_timestamp(record_header.time_offset())
+            else:
+                definition_message.track_time(buffer, offset + record_size, self.context)
+            record_size += definition_message.data_size
+        if self.crc is not None:
+            self.crc.update(buffer[offset:offset + record_size])
+        return (record_size, data_message)
+
+    def __record_size(self, buffer, offset):
+        """Return the size of the record at offset in the buffer or None if the buffer doesn't hold enough of the record to tell."""
+        available = len(buffer) - offset
+        record_header = RecordHeader(buffer, offset)
+        if record_header.message_class is MessageClass.definition:
+            # record header, reserved, architecture, global message number, field count, then 3 bytes for each field
+            size = 6
+            if available < size:
+                return None
+            size += buffer[offset + size - 1] * 3
+            if record_header.developer_data():
+                if available < size + 1:
+                    return None
+                size += 1 + buffer[offset + size] * 3
+            return size
+        return record_header.file_size + self.definition_messages[record_header.local_message()].data_size
+
+    def feed(self, data):
+        """
+        Push the next chunk of a FIT file's data into the decoder and return a list of the data messages decoded from the complete records.
+
+        Incomplete records are held until the data that completes them is fed. Call close() after the last chunk.
+        """
+        self.__pending += data
+        messages = []
+        with memoryview(self.__pending) as buffer:
+            offset = 0
+            while True:
+                size = self.__feed_step(buffer, offset, messages)
+                if not size:
+                    break
+                offset += size
+        del self.__pending[:offset]
+        self.__stream_offset += offset
+        return messages
+
+    def __feed_step(self, buffer, offset, messages):
+        """Decode the next file header, record, or CRC from the pending data and return its size or 0 if more data is needed."""
+        available = len(buffer) - offset
+        if self.__ignore_remaining:
+            return available
+        if self.__segment is None:
+            if available < FileHeader.min_file_header_size:
+                return 0
+            if self.segments and bytes(buffer[offset + 8:offset + 12]) != bytes(FileHeader.file_data_type):
+                logger.warning("Ignoring the data following the FIT file at %d", self.__stream_offset + offset)
+                self.__ignore_remaining = True
+                return available
+            if available < buffer[offset]:
+                return 0
+            self.__segment = self.__start_segment(buffer, offset, self.__stream_offset + offset)
+            self.__segment_data_remaining = self.__segment.file_header.data_size
+            return self.__segment.file_header.file_size
+        if self.__segment_data_remaining > 0:
+            record_size = self.__record_size(buffer, offset) if available > 0 else None
+            if record_size is None or available < record_size:
+                return 0
+            (record_size, data_message) = self.__decode_record(buffer, offset, self.__segment)
+            self.__segment_data_remaining -= record_size
+            if data_message is not None:
+                messages.append(data_message)
+            return record_size
+        if available < self.crc_size:
+            return 0
+        self.__end_segment(buffer, offset, self.__segment)
+        self.__segment = None
+        return self.crc_size
+
+    def close(self):
+        """Finish decoding data pushed with feed(), raising FitFileError if the FIT file was incomplete."""
+        if self.__segment is not None or (not self.segments and not self.__ignore_remaining):
+            raise FitFileError(f'FIT file truncated at {self.__stream_offset + len(self.__pending)} bytes')
+        if self.__pending and not self.__ignore_remaining:
+            logger.warning("Ignoring %d bytes following the FIT file at %d", len(self.__pending), self.__stream_offset)
+        self.__pending = bytearray()
+
+    async def amessages(self, reader, chunk_size=65536):
+        """Asynchronously yield the data messages decoded from a FIT file read in chunks from an asyncio.StreamReader."""
+        while True:
+            data = await reader.read(chunk_size)
+            if not data:
+                break
+            for data_message in self.feed(data):
+                yield data_message
+        self.close()
+
+    @property
+    def file_header(self):
+        """Return the file header of the first FIT file."""
+        return self.segments[0].file_header if self.segments else None
+
+    @property
+    def record_count(self):
+        """Return the number of records decoded from all of the FIT files."""
+        return sum(segment.record_count for segment in self.segments)
+
+    @property
+    def first_timestamp(self):
+        """Return the timestamp of the first message decoded."""
+        for segment in self.segments:
+            if segment.first_timestamp is not None:
+                return segment.first_timestamp
+        return self.context.first_timestamp
+
+    @property
+    def last_timestamp(self):
+        """Return the timestamp of the last message decoded."""
+        if self.context.last_timestamp is not None:
+            return self.context.last_timestamp
+        for segment in reversed(self.segments):
+            if segment.last_timestamp is not None:
+                return segment.last_timestamp
+        return None
+
+    @classmethod
+    def __crc_ok(cls, crcs_ok):
+        crcs_ok = [crc_ok for crc_ok in crcs_ok if crc_ok is not None]
+        return all(crcs_ok) if crcs_ok else None
+
+    @property
+    def header_crc_ok(self):
+        """Return if the header CRCs of all of the FIT files were valid or None if no header CRCs were checked."""
+        return self.__crc_ok(segment.header_crc_ok for segment in self.segments)
+
+    @property
+    def file_crc_ok(self):
+        """Return if the file CRCs of all of the FIT files were valid or None if the file CRCs weren't checked."""
+        return self.__crc_ok(segment.file_crc_ok for segment in self.segments)
+
+
+def iter_messages(filename, types=None, measurement_system=DisplayMeasure.metric, lazy=False, raw=False, timestamp_mode=TimestampMode.datetime):
+    """
+    Yield the data messages of a FIT file as they are decoded without retaining them.
+
+    The file is memory mapped and only the definition messages and timestamp context are kept while decoding.
+
+    Parameters:
+    ----------
+        filename (string): The name of the FIT file including full path.
+        types (collection): If given, only messages whose MessageType is in the collection are decoded and yielded.
+        measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to use when decoding messages.
+        lazy (bool): Yield LazyDataMessage instances that convert fields the first time they are accessed.
+        raw (bool): Yield RawDataMessage instances holding the raw field values without converting them.
+        timestamp_mode (TimestampMode): Return timestamps as datetimes or as integer FIT or Unix epoch seconds.
+
+    """
+    decoder = Decoder(measurement_system, types, lazy, raw=raw, timestamp_mode=timestamp_mode)
+    with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as file_map:
+        yield from decoder.messages(file_map)
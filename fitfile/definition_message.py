@@ -6,15 +6,27 @@ __license__ = "GPL"
 
 
 import collections
+import struct
+import threading
+import array
+import sys
 
 from .data import Schema, Data, Architecture
-from .fields import UnknownField
-from .developer_field_definition import DeveloperFieldDefinition
+from .fields import Field, UnknownField, TimestampField
+from .type_fields import StringField
+from .field_enums import TimestampMode
+from .object_fields import ObjectField
+from .developer_field_definition import DeveloperFieldDefinition, DeveloperFieldDescription
 from .definition_message_data import DefinitionMessageData
 from .field_definition import FieldDefinition
 from .message_type import MessageType
 
 
+# The parameters for converting a field's raw values: value / scale + offset in units, unless the raw value is the invalid value. For fields
+# that convert to measurements, the scale and offset convert to the metric output units.
+RawFieldInfo = collections.namedtuple('RawFieldInfo', ['units', 'scale', 'offset', 'invalid'])
+
+
 class DefinitionMessage(Data):
     """FIT file definition message."""
 
@@ -45,39 +57,189 @@ class DefinitionMessage(Data):
         )
     )
 
-    def __init__(self, record_header, dev_field_dict, file):
+    # Compiled definitions keyed by their raw bytes and the identities of their dev fields, shared by all of the files decoded in a process.
+    definition_cache = {}
+    definition_cache_size = 4096
+    definition_cache_lock = threading.Lock()
+
+    fixed_size = 5
+    field_definition_size = 3
+
+    def __init__(self, record_header, dev_field_dict, buffer, offset, timestamp_mode=TimestampMode.datetime):
         """
-        Return a DefinitionMessage instance created by reading data from a FIT file.
+        Return a DefinitionMessage instance created by decoding data from a FIT file buffer.
 
         Paramters:
             record_header (RecordHeader): the record header associated with this definition message.
             dev_field_dict (dict): a dictionary of developer defoined fields in the FIT file.
-            file (File): the FIT file instance to read the definition message data from.
+            buffer (memoryview): the buffer holding the FIT file data to decode the definition message from.
+            offset (int): the offset of the definition message in the buffer.
+            timestamp_mode (TimestampMode): how the timestamp fields of the data messages are returned.
         """
+        self.timestamp_mode = timestamp_mode
         self.reserved = None
         self.architecture = None
         self.global_message_number = None
         self.fields = None
         self.dev_fields = None
-        super().__init__(file, DefinitionMessage.dm_primary_schema, [(DefinitionMessage.dm_secondary_schema, self.__decode_secondary)])
+        super().__init__(buffer, offset, DefinitionMessage.dm_primary_schema, [(DefinitionMessage.dm_secondary_schema, self.__decode_secondary)])
 
         self.message_type = MessageType.get_type(self.global_message_number)
         self.__message_data = DefinitionMessageData.get_message_definition(self.message_type)
 
         self.field_definitions = []
         for _ in range(self.fields):
-            field_definition = FieldDefinition(file)
+            field_definition = FieldDefinition(buffer, offset + self.file_size)
             self.file_size += field_definition.file_size
             self.field_definitions.append(field_definition)
 
         self.has_dev_fields = record_header.developer_data()
         self.dev_field_definitions = []
         if self.has_dev_fields:
-            self._decode(DefinitionMessage.dm_dev_schema)
+            self._decode(buffer, DefinitionMessage.dm_dev_schema)
             for _ in range(self.dev_fields):
-                dev_field_definition = DeveloperFieldDefinition(dev_field_dict, file)
+                dev_field_definition = DeveloperFieldDefinition(dev_field_dict, buffer, offset + self.file_size)
                 self.file_size += dev_field_definition.file_size
                 self.dev_field_definitions.append(dev_field_definition)
+        self.__compile()
+
+    @classmethod
+    def get(cls, record_header, dev_field_dict, buffer, offset, timestamp_mode=TimestampMode.datetime):
+        """
+        Return a DefinitionMessage instance for the definition message at offset in the buffer, reusing a cached instance if it was seen before.
+
+        Since devices emit the same definitions in almost every file, a definition that was already decoded and compiled is looked up by its
+        raw bytes instead of being decoded again. A cached instance's offset is that of the first definition it was decoded from.
+        """
+        key = cls.__cache_key(record_header, dev_field_dict, buffer, offset, timestamp_mode)
+        definition_message = cls.definition_cache.get(key)
+        if definition_message is None:
+            definition_message = cls(record_header, dev_field_dict, buffer, offset, timestamp_mode)
+            if key is not None:
+                with cls.definition_cache_lock:
+                    if len(cls.definition_cache) >= cls.definition_cache_size:
+                        cls.definition_cache.pop(next(iter(cls.definition_cache)))
+                    cls.definition_cache[key] = definition_message
+        return definition_message
+
+    @classmethod
+    def __cache_key(cls, record_header, dev_field_dict, buffer, offset, timestamp_mode):
+        size = cls.fixed_size + (buffer[offset + cls.fixed_size - 1] * cls.field_definition_size)
+        has_dev_fields = record_header.developer_data()
+        dev_field_identities = ()
+        if has_dev_fields:
+            dev_fields_offset = offset + size + 1
+            dev_field_offsets = [dev_fields_offset + (index * cls.field_definition_size) for index in range(buffer[offset + size])]
+            size += 1 + (len(dev_field_offsets) * cls.field_definition_size)
+            # A dev field definition is the field number, size, and developer data index.
+            dev_field_descriptions = [dev_field_dict.get(DeveloperFieldDescription.key(buffer[dev_field_offset + 2], buffer[dev_field_offset]))
+                                      for dev_field_offset in dev_field_offsets]
+            if None in dev_field_descriptions:
+                return None
+            # The same dev field number can be described differently in each file.
+            dev_field_identities = tuple(dev_field_description.identity for dev_field_description in dev_field_descriptions)
+        return (timestamp_mode, has_dev_fields, bytes(buffer[offset:offset + size]), dev_field_identities)
+
+    def __compile(self):
+        """Compile a single struct that decodes all of the fields and dev fields of a data message using this definition."""
+        endian_format = Schema.endian_format(self.endian)
+        unpack_format = endian_format
+        self.__field_layout = []
+        self.__dev_field_layout = []
+        # Resolve the Field instance for each field definition once instead of for each data message.
+        self.resolved_fields = tuple(self.__resolve_field(field_definition.field_definition_number) for field_definition in self.field_definitions)
+        dev_fields = tuple(dev_field_definition.field() for dev_field_definition in self.dev_field_definitions)
+        index = 0
+        for field_definitions, fields, field_layout in [(self.field_definitions, self.resolved_fields, self.__field_layout),
+                                                        (self.dev_field_definitions, dev_fields, self.__dev_field_layout)]:
+            for field_definition, field in zip(field_definitions, fields):
+                # Only string fields decode their data as bytes, other fields with the string base type decode it as numbers.
+                as_string = field_definition.is_string() and isinstance(field, StringField)
+                count = field_definition.value_count(as_string)
+                unpack_format += field_definition.unpack_format(as_string)
+                field_layout.append((index, count, field_definition.array_typecode(as_string)))
+                index += count
+        self.__struct = struct.Struct(unpack_format)
+        # Array fields are decoded in the machine's byte order.
+        self.__byteswap = (self.endian is Architecture.Big_Endian) != (sys.byteorder == 'big')
+        self.data_size = self.__struct.size
+        self.has_dependant_fields = any(field._dependant_field_control_fields for field in self.resolved_fields)
+        # The dev fields' converters are built once per field_description, pair them with their invalid values once per definition.
+        self.resolved_dev_fields = tuple((dev_field_definition.field(), dev_field_definition.invalid()) for dev_field_definition in self.dev_field_definitions)
+        self.__compile_timestamp(endian_format)
+        self.__compile_field_names()
+        self.__compile_raw_fields()
+
+    def __compile_timestamp(self, endian_format):
+        """Find the field that carries the message's timestamp so that time can be tracked without decoding the message."""
+        self.__timestamp_field = None
+        self.__timestamp_struct = None
+        data_offset = 0
+        for field_definition, field in zip(self.field_definitions, self.resolved_fields):
+            if field.name in ['timestamp', 'timestamp_16'] and field_definition.type_count() == 1:
+                if self.__timestamp_field is None or field.name == 'timestamp':
+                    self.__timestamp_field = field
+                    self.__timestamp_offset = data_offset
+                    self.__timestamp_struct = struct.Struct(endian_format + field_definition.unpack_format())
+            data_offset += field_definition.size
+
+    def __compile_field_names(self):
+        """Map the names of the values the fields produce to where the fields' raw values are found in decoded data."""
+        self.__field_names = {}
+        for dev, field_definitions in [(False, self.field_definitions), (True, self.dev_field_definitions)]:
+            for index, field_definition in enumerate(field_definitions):
+                field = field_definition.field() if dev else self.resolved_fields[index]
+                for name in field.value_names():
+                    self.__field_names.setdefault(name, (dev, index, field, field_definition.invalid()))
+
+    def __compile_raw_fields(self):
+        """Collect the field names and conversion parameters used when returning the raw values of data messages."""
+        fields = list(zip(self.resolved_fields, self.field_definitions))
+        fields += [(dev_field_definition.field(), dev_field_definition) for dev_field_definition in self.dev_field_definitions]
+        self.raw_field_names = tuple(field.name for field, _ in fields)
+        self.raw_field_info = {field.name: self.__raw_field_info(field, field_definition) for field, field_definition in fields}
+        # Plain fields that describe the raw values for FieldValue instances.
+        self.raw_fields = {name: Field(name=name, units=info.units, scale=info.scale, offset=info.offset) for name, info in self.raw_field_info.items()}
+
+    @classmethod
+    def __raw_field_info(cls, field, field_definition):
+        if isinstance(field, ObjectField):
+            (scale, offset) = field.linear_conversion()
+        else:
+            (scale, offset) = (field._scale, field._offset)
+        return RawFieldInfo(field.units, scale, offset, field_definition.invalid())
+
+    def named_field(self, name):
+        """Return a tuple of (dev field flag, index into the decoded values, Field instance, invalid value) for the named field or None."""
+        return self.__field_names.get(name)
+
+    def field_names(self):
+        """Return the names of the values that the fields of the definition produce."""
+        return list(self.__field_names)
+
+    @classmethod
+    def __layout_values(cls, values, field_layout, byteswap):
+        field_values = []
+        for index, count, array_typecode in field_layout:
+            if array_typecode is not None:
+                field_value = array.array(array_typecode, values[index])
+                if byteswap:
+                    field_value.byteswap()
+                field_values.append(field_value)
+            elif count == 1:
+                field_values.append(values[index])
+            else:
+                field_values.append(None)
+        return field_values
+
+    def decode(self, buffer, offset):
+        """
+        Decode the data of one data message at offset in the buffer and return a tuple of lists of the raw field values and dev field values.
+
+        The values of fields that hold more than one number are returned as an array.array and the values of string fields as bytes.
+        """
+        values = self.__struct.unpack_from(buffer, offset)
+        return (self.__layout_values(values, self.__field_layout, self.__byteswap), self.__layout_values(values, self.__dev_field_layout, self.__byteswap))
 
     def __decode_secondary(self):
         try:
@@ -87,9 +249,29 @@ class DefinitionMessage(Data):
             self.endian = Architecture.Little_Endian
         return True
 
+    def track_time(self, buffer, offset, context):
+        """Update the decode context with the timestamp of the data message at offset in the buffer without decoding the message's other fields."""
+        if self.__timestamp_struct is not None:
+            (value,) = self.__timestamp_struct.unpack_from(buffer, offset + self.__timestamp_offset)
+            if self.__timestamp_field.name == 'timestamp':
+                context.absolute_timestamp_seconds(value)
+            elif context.last_timestamp_seconds is not None:
+                context.timestamp16_to_timestamp(value)
+
+    def __resolve_field(self, field_number):
+        field = self.field(field_number)
+        if isinstance(field, TimestampField):
+            return field.for_timestamp_mode(self.timestamp_mode)
+        return field
+
     def field(self, field_number):
         """Return an instance of the proper Field subclass for the given field definition."""
-        return DefinitionMessageData.reserved_field_indexes.get(field_number, self.__message_data.get(field_number, UnknownField(field_number)))
+        field = DefinitionMessageData.reserved_field_indexes.get(field_number)
+        if field is None:
+            field = self.__message_data.get(field_number)
+        if field is None:
+            field = UnknownField(field_number)
+        return field
 
     def __str__(self):
         """Return a string representation of a DefinitionMessage instance."""
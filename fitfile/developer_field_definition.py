@@ -9,10 +9,12 @@ import collections
 import logging
 
 from .data import Schema
+from .base_type import BaseType
 from .field_definition import FieldDefinitionBase
 from .message_type import MessageType
 from .definition_message_data import DefinitionMessageData
 from .object_fields import DistanceMetersField, SpeedMpsField
+from .type_fields import StringField
 from .dev_field import DevField, DevDistanceField, DerivedDevDistanceField, DevSpeedField, DerivedDevSpeedField
 from .exceptions import FitUndefDevMessageType
 
@@ -20,53 +22,47 @@ from .exceptions import FitUndefDevMessageType
 logger = logging.getLogger(__name__)
 
 
-class DeveloperFieldDefinition(FieldDefinitionBase):
-    """Developer filed definitions decoded from a FIT file."""
-
-    dfd_schema = Schema(
-        'DeveloperFieldDefinition',
-        collections.OrderedDict(
-            [
-                ('field_number', ['UINT8', 1]),
-                ('size', ['UINT8', 1]),
-                ('developer_data_index', ['UINT8', 1])
-            ]
-        )
-    )
+class DeveloperFieldDescription():
+    """
+    A developer field registered by a field_description message.
 
-    def __init__(self, dev_field_dict, file):
-        """
-        Return a DeveloperFieldDefinition instance created by reading data from a FIT file.
+    Developer fields are registered per developer data index, so fields from different apps can have the same field number. The field
+    that converts the developer field's values is built once when the field is registered and is shared by all of the definitions that use
+    the developer field.
+    """
 
-        Paramters:
-            dev_field_dict (dict): a dictionary of developer defined fields.
-            file (File):  a FIT File instance.
-        """
-        self.field_number = None
-        self.size = None
-        self.developer_data_index = None
-        super().__init__(file, DeveloperFieldDefinition.dfd_schema)
-        self.dev_field_message = dev_field_dict.get(self.field_number)
-        if self.dev_field_message is None:
-            raise FitUndefDevMessageType(f'Dev field {self.field_number} undefined in {dev_field_dict}')
-        # Parse values from dev_field_message
-        self.field_name = self.dev_field_message.fields.field_name
-        self.native_message_type = MessageType(self.dev_field_message.fields.native_message_num)
-        self.native_field_num = self.dev_field_message.fields.native_field_num
-        self.units = self.dev_field_message.fields.units
-        self.offset = self.dev_field_message.fields.offset
-        self.scale = self.dev_field_message.fields.scale
-        self.base_type = self.dev_field_message.field_values.fit_base_type_id.orig
+    def __init__(self, field_description):
+        """Return a DeveloperFieldDescription instance given a field_description DataMessage."""
+        self.field_description = field_description
+        fields = field_description.fields
+        self.developer_data_index = fields.developer_data_index
+        self.field_number = field_description.field_values.field_definition_number.orig
+        self.field_name = fields.field_name
+        self.native_message_num = fields.native_message_num
+        self.native_message_type = MessageType(self.native_message_num) if self.native_message_num is not None else None
+        self.native_field_num = fields.native_field_num
+        self.units = fields.units
+        self.offset = fields.offset
+        self.scale = fields.scale
+        self.base_type = field_description.field_values.fit_base_type_id.orig
+        # The values that the field is built from, definitions that use developer fields with the same identity can be shared across files.
+        self.identity = (self.field_name, self.native_message_num, self.native_field_num, self.units, self.offset, self.scale, self.base_type)
         # If the dev field shadows a native field, then take the field name from the native field.
         if self.native_message_type and self.native_field_num:
             field_dict = DefinitionMessageData.get_message_definition(self.native_message_type)
             field = field_dict[self.native_field_num]
             self.display_field_name = 'dev_' + field.name
-            self._field = self.__derive_field(self.display_field_name, self.units, self.scale, self.offset, field)
+            self.field = self.__derive_field(self.display_field_name, self.units, self.scale, self.offset, field)
         else:
             self.display_field_name = 'dev_' + self.field_name
-            self._field = self.__map_field(self.display_field_name, self.units, self.scale, self.offset)
-        logger.info('%s for %r field %s', self, self.native_message_type, self.native_field_num)
+            self.field = self.__map_field(self.display_field_name, self.units, self.scale, self.offset)
+        if BaseType._type_string(self.base_type) == 'CHAR':
+            self.field = StringField(self.display_field_name, units=self.units)
+
+    @classmethod
+    def key(cls, developer_data_index, field_number):
+        """Return the key that a developer field is registered under."""
+        return (developer_data_index, field_number)
 
     @classmethod
     def __derive_field(cls, field_name, units, scale, offset, field_obj):
@@ -86,6 +82,54 @@ class DeveloperFieldDefinition(FieldDefinitionBase):
             return field_map[field_name](field_name, units, scale, offset)
         return DevField(field_name, units, scale, offset)
 
+    def __str__(self):
+        """Return a string representation for the DeveloperFieldDescription instance."""
+        return f'{self.__class__.__name__}({self.developer_data_index}:{self.field_number} {self.display_field_name})'
+
+
+class DeveloperFieldDefinition(FieldDefinitionBase):
+    """Developer filed definitions decoded from a FIT file."""
+
+    dfd_schema = Schema(
+        'DeveloperFieldDefinition',
+        collections.OrderedDict(
+            [
+                ('field_number', ['UINT8', 1]),
+                ('size', ['UINT8', 1]),
+                ('developer_data_index', ['UINT8', 1])
+            ]
+        )
+    )
+
+    def __init__(self, dev_field_dict, buffer, offset):
+        """
+        Return a DeveloperFieldDefinition instance created by decoding data from a FIT file buffer.
+
+        Paramters:
+            dev_field_dict (dict): a dictionary of the DeveloperFieldDescriptions registered in the file keyed by developer data index and
+                field number.
+            buffer (memoryview): a buffer holding FIT file data.
+            offset (int): the offset of the developer field definition in the buffer.
+        """
+        self.field_number = None
+        self.size = None
+        self.developer_data_index = None
+        super().__init__(buffer, offset, DeveloperFieldDefinition.dfd_schema)
+        self.description = dev_field_dict.get(DeveloperFieldDescription.key(self.developer_data_index, self.field_number))
+        if self.description is None:
+            raise FitUndefDevMessageType(f'Dev field {self.developer_data_index}:{self.field_number} undefined in {list(dev_field_dict)}')
+        self.dev_field_message = self.description.field_description
+        self.field_name = self.description.field_name
+        self.native_message_type = self.description.native_message_type
+        self.native_field_num = self.description.native_field_num
+        self.units = self.description.units
+        self.offset = self.description.offset
+        self.scale = self.description.scale
+        self.base_type = self.description.base_type
+        self.display_field_name = self.description.display_field_name
+        self._field = self.description.field
+        logger.info('%s for %r field %s', self, self.native_message_type, self.native_field_num)
+
     def field(self):
         """Return a field instance representing the field for this DeveloperFieldDefinition instance."""
         return self._field
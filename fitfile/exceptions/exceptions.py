@@ -41,8 +41,8 @@ class FitMessageType(FitFileError):
 class FitMessageParse(FitFileError):
     """An exception happened while parsing a FIT file message."""
     def __init__(self, message, inner=None):
-        """Return a FitMessageParse instance."""
-        super().__init__(f"Failed to parse Message {repr(message)}", inner)
+        """Return a FitMessageParse instance given the message or a string describing it."""
+        super().__init__(f"Failed to parse Message {message if isinstance(message, str) else repr(message)}", inner)
 
 
 class FitDataFieldParse(FitFileError):
@@ -29,6 +29,38 @@ class FieldDefinitionBase(Data, BaseType):
         type_size = Schema.type_to_size[self.type_string()]
         return int(self.size / type_size)
 
+    def is_string(self):
+        """Return if the field has the string base type."""
+        return self.type_string() == 'CHAR'
+
+    def array_typecode(self, as_string=False):
+        """Return the array typecode for a field that holds more than one number or None."""
+        if not as_string and self.type_count() > 1:
+            return Schema.type_to_array_typecode[self.type_string()]
+        return None
+
+    def value_count(self, as_string=False):
+        """Return the number of values the field's data decodes to, strings and arrays decode to a single value."""
+        if as_string or self.array_typecode() is not None:
+            return 1
+        return self.type_count()
+
+    def unpack_format(self, as_string=False):
+        """
+        Return the struct format that decodes the field's data, padded out to the field's size.
+
+        If as_string is True, the field's data is decoded as a single bytes value. Fields with the string base type that aren't converted
+        as strings, i.e. unknown fields, are decoded as numbers.
+        """
+        if as_string:
+            return f'{self.size}s'
+        type_string = self.type_string()
+        count = self.type_count()
+        padding = self.size - (count * Schema.type_to_size[type_string])
+        if self.array_typecode() is not None:
+            return f'{count * Schema.type_to_size[type_string]}s' + ('x' * padding)
+        return (Schema.type_to_unpack_format[type_string] * count) + ('x' * padding)
+
 
 class FieldDefinition(FieldDefinitionBase):
     """Object that defines the structure of a FIT file message field."""
@@ -48,15 +80,16 @@ class FieldDefinition(FieldDefinitionBase):
         )
     )
 
-    def __init__(self, file):
+    def __init__(self, buffer, offset):
         """
-        Return a FieldDefinition instance created by reading data from a FIT file.
+        Return a FieldDefinition instance created by decoding data from a FIT file buffer.
 
         Paramters:
         ---------
-            file (File):  a FIT File instance.
+            buffer (memoryview): a buffer holding FIT file data.
+            offset (int): the offset of the field definition in the buffer.
         """
-        super().__init__(file, FieldDefinition.fd_schema)
+        super().__init__(buffer, offset, FieldDefinition.fd_schema)
 
     def __str__(self):
         """Return a string representation for the FieldDefinition instance."""
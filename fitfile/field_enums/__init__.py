@@ -6,7 +6,7 @@ __license__ = "GPL"
 
 # flake8: noqa
 
-from .field_enums import UnknownEnumValue, FieldEnum, FuzzyFieldEnum, Switch, FitBaseUnit, DisplayMeasure, DisplayHeart, DisplayPosition, DisplayOrientation, Side, BacklightMode, \
+from .field_enums import UnknownEnumValue, FieldEnum, FuzzyFieldEnum, Switch, FitBaseUnit, DisplayMeasure, TimestampMode, DisplayHeart, DisplayPosition, DisplayOrientation, Side, BacklightMode, \
     AntNetwork, SourceType, BatteryStatus, AutoSyncFrequency, BodyLocation, Gender, HeartRateZoneCalc, PowerCalc, Language, DateMode, TimeMode, Activity, ActivityType, Event, EventType, \
     LapTrigger, SessionTrigger, PersonalRecordType, GoalType, GoalRecurrence, GoalSource, WatchFaceMode, ClimbProEvent, HeartRateZonesTimerType, HeartRateZonesMethod, name_for_enum, \
     SleepActivityLevel
\ No newline at end of file
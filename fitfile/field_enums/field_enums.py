@@ -15,15 +15,35 @@ def name_for_enum(enum_instance):
 class UnknownEnumValue():
     """Returned when a value can not be cast to an FieldEnum."""
 
+    # UnknownEnumValue instances are interned per class so that unknown values found in every message don't create new instances.
+    interned_size = 1024
+
     def __init__(self, value):
         """Return a UnknownEnumValue instance."""
         self.value = value
         self.name = f'{type(self).__name__}_{value}'
 
+    @classmethod
+    def get(cls, value):
+        """Return the interned UnknownEnumValue instance for a value."""
+        instances = cls.__dict__.get('_instances')
+        if instances is None:
+            instances = {}
+            cls._instances = instances
+        try:
+            return instances[value]
+        except KeyError:
+            instance = cls(value)
+            if len(instances) < cls.interned_size:
+                instances[value] = instance
+            return instance
+        except TypeError:
+            return cls(value)
+
     @classmethod
     def from_string(cls, string, default=None):
         """Return a UnknownEnumValue instance created from a string."""
-        return cls(string)
+        return cls.get(string)
 
     def __eq__(self, other):
         """Test two UnknownEnumValue instances for equivelence."""
@@ -43,77 +63,128 @@ class UnknownEnumValue():
         return f'<{type(self).__name__}.{self.name}: {self.value}>'
 
 
+class FieldEnumLookup():
+    """The tables used to find the members of a FieldEnum by value and by name, built once per FieldEnum class."""
+
+    fuzzy_matches_size = 1024
+
+    def __init__(self, enum_class):
+        """Return a FieldEnumLookup instance for a FieldEnum class."""
+        self.values = {member.value: member for member in enum_class}
+        self.names = dict(enum_class.__members__)
+        self.lower_names = {}
+        for name, member in self.names.items():
+            self.lower_names.setdefault(name.lower(), member)
+        self.lower_names_list = [(name.lower(), member) for name, member in self.names.items()]
+        self.fuzzy_matches = {}
+
+    def member(self, value):
+        """Return the member with the value or name or None."""
+        try:
+            member = self.values.get(value)
+        except TypeError:
+            return None
+        if member is None and isinstance(value, str):
+            return self.names.get(value)
+        return member
+
+    def case_insensitive_member(self, string):
+        """Return the member whose name matches the string ignoring case or None."""
+        return self.lower_names.get(str(string).lower())
+
+    def fuzzy_member(self, string):
+        """Return the first member whose name is found in the string ignoring case or None."""
+        try:
+            return self.fuzzy_matches[string]
+        except KeyError:
+            pass
+        except TypeError:
+            return self.__fuzzy_match(string)
+        member = self.__fuzzy_match(string)
+        if len(self.fuzzy_matches) < self.fuzzy_matches_size:
+            self.fuzzy_matches[string] = member
+        return member
+
+    def __fuzzy_match(self, string):
+        lower_string = str(string).lower()
+        for name, member in self.lower_names_list:
+            if name in lower_string:
+                return member
+        return None
+
+
+_field_enum_lookups = {}
+
+
 class FieldEnum(enum.Enum):
     """A enum representing a FIT file message field value."""
 
     @classmethod
-    def _from_string(cls, string):
+    def _lookup(cls):
+        lookup = _field_enum_lookups.get(cls)
+        if lookup is None:
+            lookup = FieldEnumLookup(cls)
+            _field_enum_lookups[cls] = lookup
+        return lookup
+
+    @classmethod
+    def from_value(cls, value):
+        """Return the member of the FieldEnum with the value or None."""
         try:
-            return cls(string)
-        except Exception:
-            return getattr(cls, string)
+            return cls._lookup().values.get(value)
+        except TypeError:
+            return None
 
     @classmethod
     def strict_from_string(cls, string):
         """Return an instance of FieldEnum instantiated with string."""
-        try:
-            return cls._from_string(string)
-        except (AttributeError, TypeError):
-            return None
+        return cls._lookup().member(string)
+
+    @classmethod
+    def _from_string_ext(cls, lookup, string):
+        return None
 
     @classmethod
     def from_string(cls, string, default=None):
         """Return an instance of FieldEnum instantiated with string or an instancxe of UnknownEnumValue if not found."""
-        try:
-            return cls._from_string(string)
-        except (AttributeError, TypeError):
-            if default:
-                return default
-            return UnknownEnumValue(string)
+        lookup = cls._lookup()
+        member = lookup.member(string)
+        if member is not None:
+            return member
+        if default:
+            return default
+        member = cls._from_string_ext(lookup, string)
+        if member is not None:
+            return member
+        return UnknownEnumValue.get(string)
 
 
 class CaseInsensitiveFieldEnum(FieldEnum):
     """A enum representing a field value that can be instantiated with a case insensitive match."""
 
     @classmethod
-    def from_string_ext(cls, string):
-        """Return an instance of FieldEnum instantiated with string using a case insensitive match."""
-        for name, value in cls.__members__.items():
-            if name.lower() == str(string).lower():
-                return value
-        return UnknownEnumValue(string)
+    def _from_string_ext(cls, lookup, string):
+        return lookup.case_insensitive_member(string)
 
     @classmethod
-    def from_string(cls, string, default=None):
-        """Return an instance of FieldEnum instantiated with string."""
-        try:
-            return cls._from_string(string)
-        except (AttributeError, TypeError):
-            if default:
-                return default
-            return cls.from_string_ext(string)
+    def from_string_ext(cls, string):
+        """Return an instance of FieldEnum instantiated with string using a case insensitive match."""
+        member = cls._lookup().case_insensitive_member(string)
+        return member if member is not None else UnknownEnumValue.get(string)
 
 
 class FuzzyFieldEnum(FieldEnum):
     """A enum representing a field value that can be instantiated with a fuzzy match."""
 
     @classmethod
-    def from_string_ext(cls, string):
-        """Return an instance of FieldEnum instantiated with string using a fuzzy match."""
-        for name, value in cls.__members__.items():
-            if name.lower() in str(string).lower():
-                return value
-        return UnknownEnumValue(string)
+    def _from_string_ext(cls, lookup, string):
+        return lookup.fuzzy_member(string)
 
     @classmethod
-    def from_string(cls, string, default=None):
-        """Return an instance of FieldEnum instantiated with string."""
-        try:
-            return cls._from_string(string)
-        except (AttributeError, TypeError):
-            if default:
-                return default
-            return cls.from_string_ext(string)
+    def from_string_ext(cls, string):
+        """Return an instance of FieldEnum instantiated with string using a fuzzy match."""
+        member = cls._lookup().fuzzy_member(string)
+        return member if member is not None else UnknownEnumValue.get(string)
 
 
 class Switch(FieldEnum):
@@ -139,6 +210,14 @@ class DisplayMeasure(FuzzyFieldEnum):
     invalid     = 255
 
 
+class TimestampMode(enum.Enum):
+    """An enum that defines how timestamps are returned from parsed FIT files."""
+
+    datetime        = 0
+    fit_seconds     = 1
+    unix_seconds    = 2
+
+
 class DisplayHeart(FieldEnum):
     """An enum that defines how heart rate will be displayed."""
 
@@ -8,6 +8,8 @@ __license__ = "GPL"
 class FieldValue(dict):
     """Object that represents a FIT field message field value."""
 
+    __slots__ = ('field', 'orig', 'invalid')
+
     def __init__(self, field, orig, invalid, **kwargs):
         """Return a FieldValue instance given the field."""
         self.field = field
@@ -6,14 +6,24 @@ __license__ = "GPL"
 
 
 import datetime
+import array
 
-from .conversions.conversions import ms_to_dt_time, hours_to_dt_time, min_to_dt_time, secs_to_dt_time
-from .field_enums import DisplayMeasure
+from .conversions.conversions import ms_to_dt_time, hours_to_dt_time, min_to_dt_time, secs_to_dt_time, fit_timestamp_to_datetime, fit_epoch_unix_seconds
+from .field_enums import DisplayMeasure, TimestampMode
 from .field_value import FieldValue
 
 
+# Fields that hold more than one number are decoded as array.array values.
+sequence_types = (list, array.array)
+
+
 class Field():
-    """The base object for all FIT file message fields."""
+    """
+    The base object for all FIT file message fields.
+
+    Field instances are shared by all messages and all parses, so conversion must not store any state on the instance. Fields whose
+    conversion depends on the measurement system are passed it as a parameter.
+    """
 
     _name = None
     _units = None
@@ -23,6 +33,7 @@ class Field():
 
     def __init__(self, **kwargs):
         """Return a new instance of the Field class."""
+        self.__dependant_fields = {}
         for key, value in kwargs.items():
             vars(self)['_' + key] = value
         if self._name is None:
@@ -38,10 +49,20 @@ class Field():
         """Return the units of the field."""
         return self._units
 
+    def value_names(self):
+        """Return the names of the values that converting the field produces."""
+        return [self._name]
+
+    def field_value_names(self):
+        """Return the names of the fields of the FieldValue instances that converting the field produces."""
+        return [self._name]
+
     def _invalid_single(self, value, invalid):
         return (value == invalid)
 
     def _invalid_many(self, values, invalid):
+        if type(self)._invalid_single is Field._invalid_single:
+            return invalid in values
         for value in values:
             if self._invalid_single(value, invalid):
                 return True
@@ -49,7 +70,7 @@ class Field():
 
     def is_invalid(self, value, invalid):
         """Return if the field's value is valid."""
-        if isinstance(value, list):
+        if isinstance(value, sequence_types):
             return self._invalid_many(value, invalid)
         return self._invalid_single(value, invalid)
 
@@ -58,7 +79,11 @@ class Field():
             return (value / self._scale) + self._offset
 
     def __convert_many(self, _convert_single, value, invalid):
-        if isinstance(value, list):
+        if isinstance(value, sequence_types):
+            if type(self)._convert_single is Field._convert_single:
+                # Apply the scale and offset inline instead of calling _convert_single for every value of an array.
+                (scale, offset) = (self._scale, self._offset)
+                return [(sub_value / scale) + offset if sub_value != invalid else None for sub_value in value]
             return [_convert_single(sub_value, invalid) for sub_value in value]
         return _convert_single(value, invalid)
 
@@ -67,14 +92,30 @@ class Field():
 
     def convert(self, value, invalid, measurement_system=DisplayMeasure.metric):
         """Return a FieldValue as intepretted by the field's rules."""
-        self.measurement_system = measurement_system
         return [FieldValue(self, value, invalid, **{self._name: self._convert_many(value, invalid)})]
 
     def reconvert(self, value, invalid, measurement_system=DisplayMeasure.metric):
         """Return the field's value as intepretted by the field's rules."""
-        self.measurement_system = measurement_system
         return {self._name: self._convert_many(value, invalid)}
 
+    def resolve_dependant_field(self, control_values):
+        """
+        Return the dependant field for the values of the control fields, reusing the field resolved for the same control values before.
+
+        The memoized fields are derived only from the control values, so they are the same for all messages and all parses.
+        """
+        # Key on the types too so that an IntEnum control value doesn't match an integer control value.
+        key = tuple((type(control_value), control_value) for control_value in control_values)
+        try:
+            return self.__dependant_fields[key]
+        except KeyError:
+            dependant_field = self.dependant_field(control_values)
+            self.__dependant_fields[key] = dependant_field
+            return dependant_field
+        except TypeError:
+            # Control values that aren't hashable can't be memoized.
+            return self.dependant_field(control_values)
+
     def __repr__(self):
         """Return a string representation of a Field instance."""
         return f'{self.__class__.__name__} ({self._name})'
@@ -171,10 +212,36 @@ class TimestampField(NamedField):
 
     _utc = None
 
+    def timestamp(self, value):
+        """Return a datetime given a FIT timestamp value."""
+        return fit_timestamp_to_datetime(value, self._utc)
+
+    def _convert_single(self, value, invalid):
+        return self.timestamp(value)
+
+    def for_timestamp_mode(self, timestamp_mode):
+        """Return a field that returns the values of this field as the TimestampMode specifies."""
+        if timestamp_mode is TimestampMode.fit_seconds:
+            return FitSecondsTimestampField(name=self._name, utc=self._utc)
+        if timestamp_mode is TimestampMode.unix_seconds:
+            return UnixSecondsTimestampField(name=self._name, utc=self._utc)
+        return self
+
+
+class FitSecondsTimestampField(TimestampField):
+    """A timestamp field whose values are returned as integer seconds since the FIT epoch."""
+
+    _epoch_offset = 0
+
+    # Like TimestampField, the invalid value is converted too so that a message has the same values in all timestamp modes.
     def _convert_single(self, value, invalid):
-        if self._utc:
-            return datetime.datetime(1989, 12, 31, 0, 0, 0, tzinfo=datetime.timezone.utc) + datetime.timedelta(seconds=value)
-        return datetime.datetime(1989, 12, 31, 0, 0, 0) + datetime.timedelta(seconds=value)
+        return value + self._epoch_offset
+
+
+class UnixSecondsTimestampField(FitSecondsTimestampField):
+    """A timestamp field whose values are returned as integer seconds since the Unix epoch, local timestamps are offset the same way."""
+
+    _epoch_offset = fit_epoch_unix_seconds
 
 
 class TimeMsField(NamedField):
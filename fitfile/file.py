@@ -7,13 +7,17 @@ __license__ = "GPL"
 
 import logging
 import datetime
+import mmap as mmap_module
 
+from .decoder import Decoder
 from .file_header import FileHeader
-from .record_header import RecordHeader, MessageClass
-from .definition_message import DefinitionMessage
-from .data_message import DataMessageDecodeContext, DataMessage
+from .data_message import CachedDataMessage
+from .cache import ParseCache
+from .columns import to_columns
+from .exceptions import FitFileError
 from .message_type import MessageType
-from .field_enums import DisplayMeasure
+from .conversions.conversions import fit_epoch_unix_seconds, fit_timestamp_to_datetime
+from .field_enums import DisplayMeasure, TimestampMode
 
 
 logger = logging.getLogger(__name__)
@@ -24,9 +28,24 @@ name_regex = r'\w+\.(fit|FIT)'
 # dynamically generated class properties
 # pylint: disable=no-member
 class File():
-    """Object that represents a FIT file."""
+    """
+    Object that represents a FIT file.
 
-    def __init__(self, filename, measurement_system=DisplayMeasure.metric):
+    Parsing is thread safe: the decoding state is held per File instance and the shared field definitions hold no per parse state, so
+    files can be parsed concurrently from a thread pool, each with its own measurement system.
+
+    Files loaded from a parse cache hold CachedDataMessage instances that have the converted field values of the messages, but not their
+    raw values or FieldValue instances.
+    """
+
+    # Messages that are always decoded since the file summary is built from them.
+    summary_message_types = {
+        MessageType.file_id, MessageType.device_settings, MessageType.start, MessageType.end, MessageType.sport, MessageType.monitoring_info,
+        MessageType.dev_data_id, MessageType.field_description
+    }
+
+    def __init__(self, filename, measurement_system=DisplayMeasure.metric, mmap=False, message_types=None, lazy=False, verify_crc=False,
+                 cache_dir=None, cache_size=ParseCache.default_max_size, compact=False, keep_messages=True, raw=False, timestamp_mode=TimestampMode.datetime):
         """
         Return a File instance by parsing a FIT file.
 
@@ -34,69 +53,198 @@ class File():
         ----------
             filename (string): The name of the FIT file including full path.
             measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to uwe when parsing the FIT file.
+            mmap (bool): Memory map the FIT file instead of reading it into memory.
+            message_types (collection): If given, only decode messages of these MessageTypes and the messages needed for the file summary.
+            lazy (bool): Hold the raw values of message fields and only convert fields the first time they are accessed.
+            verify_crc (bool): Check the header and file CRCs while parsing, the results are in header_crc_ok and file_crc_ok.
+            cache_dir (string): If given, load the parsed file from this directory if it was parsed before, else parse it and save it there.
+            cache_size (int): The maximum size in bytes of the cache directory, the least recently used files are removed to stay under it.
+            compact (bool): Store only the raw values of message fields and convert fields each time they are accessed, to minimize memory use.
+            keep_messages (bool): Keep all messages in the messages list as well as in the lists of messages of each message type.
+            raw (bool): Hold the raw values of the message fields without converting them, except for the messages the file summary is built from.
+            timestamp_mode (TimestampMode): Return message timestamps as datetimes or as integer FIT or Unix epoch seconds, the summary uses datetimes.
+
+        """
+        self.__init(filename, measurement_system, message_types, lazy, verify_crc, compact, keep_messages, raw, timestamp_mode)
+        with open(filename, 'rb') as file:
+            if mmap:
+                with mmap_module.mmap(file.fileno(), 0, access=mmap_module.ACCESS_READ) as file_map:
+                    self.__load(file_map, cache_dir, cache_size)
+            else:
+                self.__load(file.read(), cache_dir, cache_size)
+        self.__sumarize()
+
+    @classmethod
+    def from_bytes(cls, buffer, measurement_system=DisplayMeasure.metric, filename=None, message_types=None, lazy=False, verify_crc=False, compact=False,
+                   keep_messages=True, raw=False, timestamp_mode=TimestampMode.datetime):
+        """
+        Return a File instance by parsing FIT file data held in memory.
+
+        Parameters:
+        ----------
+            buffer (bytes, bytearray, memoryview, mmap): The contents of a FIT file.
+            measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to uwe when parsing the FIT file.
+            filename (string): An optional name to associate with the FIT file data.
+            message_types (collection): If given, only decode messages of these MessageTypes and the messages needed for the file summary.
+            lazy (bool): Hold the raw values of message fields and only convert fields the first time they are accessed.
+            verify_crc (bool): Check the header and file CRCs while parsing, the results are in header_crc_ok and file_crc_ok.
+            compact (bool): Store only the raw values of message fields and convert fields each time they are accessed, to minimize memory use.
+            keep_messages (bool): Keep all messages in the messages list as well as in the lists of messages of each message type.
+            raw (bool): Hold the raw values of the message fields without converting them, except for the messages the file summary is built from.
+            timestamp_mode (TimestampMode): Return message timestamps as datetimes or as integer FIT or Unix epoch seconds, the summary uses datetimes.
+
+        """
+        fit_file = cls.__new__(cls)
+        fit_file.__init(filename, measurement_system, message_types, lazy, verify_crc, compact, keep_messages, raw, timestamp_mode)
+        fit_file.__parse(buffer)
+        fit_file.__sumarize()
+        return fit_file
+
+    @classmethod
+    async def from_stream(cls, reader, measurement_system=DisplayMeasure.metric, filename=None, message_types=None, lazy=False, verify_crc=False,
+                          chunk_size=65536, compact=False, keep_messages=True, raw=False, timestamp_mode=TimestampMode.datetime):
+        """
+        Return a File instance by parsing FIT file data read asynchronously from a stream, decoding each chunk as it is read.
+
+        Parameters:
+        ----------
+            reader (asyncio.StreamReader): A stream with a read(n) coroutine that returns the FIT file data, b'' at the end of the data.
+            measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to uwe when parsing the FIT file.
+            filename (string): An optional name to associate with the FIT file data.
+            message_types (collection): If given, only decode messages of these MessageTypes and the messages needed for the file summary.
+            lazy (bool): Hold the raw values of message fields and only convert fields the first time they are accessed.
+            verify_crc (bool): Check the header and file CRCs while parsing, the results are in header_crc_ok and file_crc_ok.
+            chunk_size (int): The maximum number of bytes to read from the stream at a time.
+            compact (bool): Store only the raw values of message fields and convert fields each time they are accessed, to minimize memory use.
+            keep_messages (bool): Keep all messages in the messages list as well as in the lists of messages of each message type.
+            raw (bool): Hold the raw values of the message fields without converting them, except for the messages the file summary is built from.
+            timestamp_mode (TimestampMode): Return message timestamps as datetimes or as integer FIT or Unix epoch seconds, the summary uses datetimes.
 
         """
+        fit_file = cls.__new__(cls)
+        fit_file.__init(filename, measurement_system, message_types, lazy, verify_crc, compact, keep_messages, raw, timestamp_mode)
+        await fit_file.__aparse(reader, chunk_size)
+        fit_file.__sumarize()
+        return fit_file
+
+    def __init(self, filename, measurement_system, message_types, lazy, verify_crc, compact, keep_messages, raw, timestamp_mode):
         self.filename = filename
         self.measurement_system = measurement_system
+        self.__decode_message_types = (set(message_types) | self.summary_message_types) if message_types is not None else None
+        self.__lazy = lazy
+        self.__verify_crc = verify_crc
+        self.__compact = compact
+        self.__keep_messages = keep_messages
+        self.__raw = raw
+        self.timestamp_mode = timestamp_mode
         self.message_types = []
         self.messages = []
+        self.cached = False
         for message_type in MessageType:
             vars(self)[message_type.name] = []
-        with open(filename, 'rb') as file:
-            self.__parse(file)
-        self.__sumarize()
 
-    def __parse(self, file):
+    def __decoder(self):
         logger.debug("Parsing File %s", self.filename)
-        self.file_header = FileHeader(file)
+        return Decoder(self.measurement_system, self.__decode_message_types, self.__lazy, self.__verify_crc, self.__compact, self.__raw, self.summary_message_types,
+                       self.timestamp_mode)
+
+    def __parse(self, buffer):
+        decoder = self.__decoder()
+        for data_message in decoder.messages(buffer):
+            logger.debug("Parsed %r", data_message.type)
+            self.__save_message(data_message.type, data_message)
+        self.__parsed(decoder)
+
+    def __load(self, buffer, cache_dir, cache_size):
+        if cache_dir is None:
+            self.__parse(buffer)
+            return
+        cache = ParseCache(cache_dir, cache_size)
+        decode_message_types = sorted(message_type.value for message_type in self.__decode_message_types) if self.__decode_message_types is not None else None
+        key = cache.key(buffer, FileHeader(buffer).profile_version, self.measurement_system, decode_message_types, self.__verify_crc, self.__raw,
+                        self.timestamp_mode)
+        state = cache.load(key)
+        if state is not None:
+            self.__restore(state)
+        else:
+            self.__parse(buffer)
+            cache.store(key, self.__cache_state())
+
+    def __cache_state(self):
+        return {
+            'messages': [(message.type, dict(message.fields)) for message in self.__all_messages()],
+            'file_header': self.file_header,
+            'record_count': self.record_count,
+            'segments': self.segments,
+            'last_message_timestamp': self.last_message_timestamp,
+            'header_crc_ok': self.header_crc_ok,
+            'file_crc_ok': self.file_crc_ok
+        }
+
+    def __all_messages(self):
+        if self.__keep_messages:
+            return self.messages
+        return [message for message_type in self.message_types for message in self[message_type]]
+
+    def __restore(self, state):
+        logger.debug("Restoring File %s from the cache", self.filename)
+        for message_type, fields in state['messages']:
+            self.__save_message(message_type, CachedDataMessage(message_type, fields))
+        self.file_header = state['file_header']
         self.data_size = self.file_header.data_size
         self._definition_messages = {}
-        self.__dev_fields = {}
-        data_consumed = 0
-        self.record_count = 0
-        data_message_context = DataMessageDecodeContext()
-        while self.data_size > data_consumed:
-            record_header = RecordHeader(file)
-            local_message_num = record_header.local_message()
-            data_consumed += record_header.file_size
-            self.record_count += 1
-            logger.debug("Parsed record %r", record_header)
-            if record_header.message_class is MessageClass.definition:
-                definition_message = DefinitionMessage(record_header, self.__dev_fields, file)
-                logger.debug("  Definition [%d]: %s", local_message_num, definition_message)
-                data_consumed += definition_message.file_size
-                self._definition_messages[local_message_num] = definition_message
-            else:
-                definition_message = self._definition_messages[local_message_num]
-                data_message = DataMessage(definition_message, file, self.measurement_system, data_message_context)
-                logger.debug("  Data [%d]: %s", local_message_num, data_message)
-                data_consumed += data_message.file_size
-                data_message_type = data_message.type
-                if data_message_type == MessageType.field_description:
-                    self.__dev_fields[data_message.fields.field_definition_number] = data_message
-                logger.debug("Parsed %r", data_message_type)
-                self.__save_message(data_message_type, data_message)
-            logger.debug("Record %d: consumed %d of %s %r", self.record_count, data_consumed, self.data_size, self.measurement_system)
-        self.last_message_timestamp = data_message_context.last_timestamp
+        self.record_count = state['record_count']
+        self.segments = state['segments']
+        self.last_message_timestamp = state['last_message_timestamp']
+        self.header_crc_ok = state['header_crc_ok']
+        self.file_crc_ok = state['file_crc_ok']
+        self.cached = True
+
+    async def __aparse(self, reader, chunk_size):
+        decoder = self.__decoder()
+        async for data_message in decoder.amessages(reader, chunk_size):
+            logger.debug("Parsed %r", data_message.type)
+            self.__save_message(data_message.type, data_message)
+        self.__parsed(decoder)
+
+    def __parsed(self, decoder):
+        self.file_header = decoder.file_header
+        self.data_size = self.file_header.data_size
+        self._definition_messages = decoder.definition_messages
+        self.record_count = decoder.record_count
+        # Chained FIT files are decoded into one stream of messages, the segments describe the individual files.
+        self.segments = decoder.segments
+        self.last_message_timestamp = decoder.last_timestamp
+        # None if the CRC wasn't checked or, for the header, the file doesn't have a header CRC.
+        self.header_crc_ok = decoder.header_crc_ok
+        self.file_crc_ok = decoder.file_crc_ok
 
     def __save_message(self, data_message_type, data_message):
         if data_message_type.name in vars(self):
             vars(self)[data_message_type.name].append(data_message)
         else:
             vars(self)[data_message_type.name] = [data_message]
-        self.messages.append(data_message)
+        if self.__keep_messages:
+            self.messages.append(data_message)
         if data_message_type not in self.message_types:
             self.message_types.append(data_message_type)
 
-    @classmethod
-    def __calculate_utc_offset(cls, message):
-        time_utc = message.fields.timestamp
-        time_local = message.fields.local_timestamp
+    def __datetime(self, timestamp, utc=True):
+        # The file summary uses datetimes whatever the TimestampMode the messages were decoded with.
+        if timestamp is None or self.timestamp_mode is TimestampMode.datetime:
+            return timestamp
+        if self.timestamp_mode is TimestampMode.unix_seconds:
+            timestamp -= fit_epoch_unix_seconds
+        return fit_timestamp_to_datetime(timestamp, utc)
+
+    def __calculate_utc_offset(self, message):
+        time_utc = self.__datetime(message.fields.timestamp)
+        time_local = self.__datetime(message.fields.local_timestamp, utc=False)
         return (time_local - time_utc.replace(tzinfo=None)).total_seconds()
 
     def __sumarize(self):
         first_file_id = self.file_id[0]
-        self.time_created = first_file_id.fields.time_created
+        self.time_created = self.__datetime(first_file_id.fields.time_created)
         self.type = first_file_id.fields.type
         self.product = first_file_id.fields.product
         self.serial_number = first_file_id.fields.serial_number
@@ -118,11 +266,11 @@ class File():
             self.time_ended_local = self.time_created_local
         # File start and end times
         if MessageType.start in self.message_types:
-            self.start_time = self.start[0].fields.timestamp
+            self.start_time = self.__datetime(self.start[0].fields.timestamp)
         else:
             self.start_time = self.time_created
         if MessageType.end in self.message_types:
-            self.end_time = self.end[0].fields.timestamp
+            self.end_time = self.__datetime(self.end[0].fields.timestamp)
         else:
             self.end_time = self.last_message_timestamp
         if MessageType.sport in self.message_types:
@@ -147,6 +295,22 @@ class File():
             return dt.astimezone(self.local_tz).replace(tzinfo=None)
         return dt.replace(tzinfo=None)
 
+    def to_columns(self, message_type, fields=None):
+        """
+        Return a dictionary of NumPy masked arrays, one per field, holding the values of all of the file's messages of a message type.
+
+        Requires NumPy. The columns are built from the messages' raw decoded values with invalid and missing values masked.
+
+        Parameters:
+        ----------
+            message_type (MessageType): The type of messages to export, i.e. MessageType.record or MessageType.monitoring.
+            fields (list): The names of the fields to export, all of the fields found in the messages if not given.
+
+        """
+        if self.cached:
+            raise FitFileError(f'{self.filename} was loaded from the parse cache, columns need the raw values of its messages')
+        return to_columns(self[message_type], fields, self.measurement_system, self.timestamp_mode)
+
     def __getitem__(self, message_type):
         """Return the attribute named name."""
         return vars(self).get(message_type.name, [])
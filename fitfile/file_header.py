@@ -38,14 +38,14 @@ class FileHeader(Data):
     file_data_type = [46, 70, 73, 84]
 #    file_data_type = ['.', 'F', 'I', 'T']
 
-    def __init__(self, file):
-        """Return a FileHeader instance created by reading data from a Fit file."""
+    def __init__(self, buffer, offset=0):
+        """Return a FileHeader instance created by decoding data from a buffer holding a Fit file."""
         self.header_size = None
         self.protocol_version = None
         self.profile_version = None
         self.data_size = None
         self.data_type = None
-        super().__init__(file, FileHeader.fh_primary_schema, [(FileHeader.fh_optional_schema, self.__decode_secondary)])
+        super().__init__(buffer, offset, FileHeader.fh_primary_schema, [(FileHeader.fh_optional_schema, self.__decode_secondary)])
         self.__check()
 
     def __decode_secondary(self):
@@ -18,12 +18,12 @@ class ManufacturerField(EnumField):
     _enum = Manufacturer
 
     def _convert_single(self, value, invalid):
-        try:
-            return self._enum(value)
-        except Exception:
-            if value >= Manufacturer.Garmin_local_start.value:
-                return Manufacturer.Garmin_local
-            return Manufacturer.unknown
+        manufacturer = self._enum.from_value(value)
+        if manufacturer is not None:
+            return manufacturer
+        if value >= Manufacturer.Garmin_local_start.value:
+            return Manufacturer.Garmin_local
+        return Manufacturer.unknown
 
 
 class BaseProductField(EnumField):
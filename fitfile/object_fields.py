@@ -5,7 +5,7 @@ __copyright__ = "Copyright Tom Goetz"
 __license__ = "GPL"
 
 
-from .fields import Field
+from .fields import Field, sequence_types
 from .field_enums import DisplayMeasure
 from .field_value import FieldValue
 from .measurement import Distance, Speed, Weight, Longitude, Latitude, Temperature
@@ -23,20 +23,27 @@ class ObjectField(Field):
     def _invalid_single(self, value, invalid):
         return value.is_invalid()
 
-    def _convert_single(self, value, invalid):
-        return self.output_func(value, self.measurement_system)
+    def __output(self, value_obj, measurement_system):
+        if isinstance(value_obj, list):
+            return [self.output_func(sub_value_obj, measurement_system) for sub_value_obj in value_obj]
+        return self.output_func(value_obj, measurement_system)
 
     def convert(self, value, invalid, measurement_system=DisplayMeasure.metric):
         """Return a FieldValue containing the field value as a Python object."""
-        self.measurement_system = measurement_system
         # apply scle and offset to invalid to or tests for invalid will fail!!
         value_obj = self.obj_func((value / self._scale) - self._offset, (invalid / self._scale) - self._offset)
-        return [FieldValue(self, value_obj, invalid, **{self._name: self._convert_many(value_obj, invalid)})]
+        return [FieldValue(self, value_obj, invalid, **{self._name: self.__output(value_obj, measurement_system)})]
 
     def reconvert(self, value_obj, invalid, measurement_system=DisplayMeasure.metric):
         """Return a FieldValue containing the field value as a Python object."""
-        self.measurement_system = measurement_system
-        return {self._name: self._convert_many(value_obj, invalid)}
+        return {self._name: self.__output(value_obj, measurement_system)}
+
+    def linear_conversion(self, measurement_system=DisplayMeasure.metric):
+        """Return a tuple of the scale and offset that convert a raw value to the field's output for the measurement system: value / scale + offset."""
+        # The measurement objects convert units by scaling, so derive the unit conversion from the conversion of two values.
+        (zero, one) = [self.output_func(self.obj_func(value, float('nan')), measurement_system) for value in (0.0, 1.0)]
+        unit_factor = one - zero
+        return (self._scale / unit_factor, zero - (self._offset * unit_factor))
 
 
 class HeightField(ObjectField):
@@ -153,8 +160,17 @@ class CompressedSpeedDistanceField(Field):
     speed_field = SpeedMpsField('speed')
     distance_field = DistanceCentimetersToKmsField('distance')
 
-    def _convert_single(self, value, invalid):
-        """Convert the value to sub fields."""
+    def __convert_sub_fields(self, value, measurement_system):
+        if isinstance(value, sequence_types):
+            return [self.__convert_sub_fields(sub_value, measurement_system) for sub_value in value]
         speed = value & 0x3f
         distance = value >> 12
-        return self.speed_field.convert(speed, 0xff, self.measurement_system) + self.distance_field.convert(distance, 0xff, self.measurement_system)
+        return self.speed_field.convert(speed, 0xff, measurement_system) + self.distance_field.convert(distance, 0xff, measurement_system)
+
+    def convert(self, value, invalid, measurement_system=DisplayMeasure.metric):
+        """Convert the value to sub fields."""
+        return [FieldValue(self, value, invalid, **{self._name: self.__convert_sub_fields(value, measurement_system)})]
+
+    def reconvert(self, value, invalid, measurement_system=DisplayMeasure.metric):
+        """Convert the value to sub fields."""
+        return {self._name: self.__convert_sub_fields(value, measurement_system)}
@@ -5,11 +5,8 @@ __copyright__ = "Copyright Tom Goetz"
 __license__ = "GPL"
 
 
-import collections
 import enum
 
-from .data import Schema, Data
-
 
 class MessageClass(enum.Enum):
     """Enum reprersenting the class of a message."""
@@ -18,39 +15,48 @@ class MessageClass(enum.Enum):
     definition  = 1
 
 
-class RecordHeader(Data):
+class RecordHeader():
     """Object that represents a FIT file record header."""
 
-    rh_schema = Schema(
-        'RecordHeader',
-        collections.OrderedDict([('record_header', ['UINT8', 1])])
-    )
+    # One is decoded for every record, so it's a single byte read into a slotted object instead of a schema decoded Data object.
+    __slots__ = ('offset', 'record_header', 'message_class')
+
+    file_size = 1
     message_type_string = ['data', 'definition']
 
-    def __init__(self, file):
-        """Return a RecordHeader instance created by reading the record header data from a FIT file."""
-        self.record_header = None
-        super().__init__(file, self.rh_schema)
+    def __init__(self, buffer, offset):
+        """Return a RecordHeader instance created by decoding the record header data at offset in a buffer holding a FIT file."""
+        self.offset = offset
+        self.record_header = buffer[offset]
         self.message_class = MessageClass(self.message_type())
 
-    def __compressed_timestamp(self):
+    def compressed_timestamp(self):
+        """Return if the record header is a compressed timestamp header for a data message."""
         return (self.record_header & 0x80) == 0x80
 
     def message_type(self):
         """Return the type of the message."""
-        return (self.record_header & 0x40) == 0x40
+        return not self.compressed_timestamp() and (self.record_header & 0x40) == 0x40
 
     def developer_data(self):
         """Return if the message contains developer data."""
-        return (self.record_header & 0x60) == 0x60
+        return not self.compressed_timestamp() and (self.record_header & 0x60) == 0x60
 
     def local_message(self):
         """Return if the message is a local message."""
+        if self.compressed_timestamp():
+            return (self.record_header >> 5) & 0x03
         return (self.record_header & 0x0f)
 
+    def time_offset(self):
+        """Return the time offset in seconds, the 5 least significant bits of the message's timestamp, of a compressed timestamp header or None."""
+        if self.compressed_timestamp():
+            return (self.record_header & 0x1f)
+        return None
+
     def __str__(self):
         """Return a string representation of a RecordHeader instance."""
-        return f'RecordHeader: Local {self.message_class.name} message {self.local_message()} (Compressed {self.__compressed_timestamp()})'
+        return f'RecordHeader: Local {self.message_class.name} message {self.local_message()} (Compressed {self.compressed_timestamp()})'
 
     def __repr__(self):
         """Return a string representation of a RecordHeader instance."""
@@ -0,0 +1,96 @@
+"""Code that quickly summarizes a FIT file without decoding most of its messages."""
+
+__author__ = "Tom Goetz"
+__copyright__ = "Copyright Tom Goetz"
+__license__ = "GPL"
+
+
+import logging
+import mmap
+
+from .decoder import Decoder
+from .message_type import MessageType
+from .field_enums import DisplayMeasure
+
+
+logger = logging.getLogger(__name__)
+
+
+class QuickSummary():
+    """
+    Object that summarizes a FIT file for cataloguing.
+
+    Only the file_id, device_settings, and sport messages are decoded. All other messages are skipped over using their definitions, only
+    their timestamps are read so that the first and last timestamps of the file are known.
+    """
+
+    decoded_message_types = {MessageType.file_id, MessageType.device_settings, MessageType.sport}
+
+    def __init__(self, filename, measurement_system=DisplayMeasure.metric):
+        """
+        Return a QuickSummary instance by scanning a FIT file.
+
+        Parameters:
+        ----------
+            filename (string): The name of the FIT file including full path.
+            measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to use when decoding messages.
+
+        """
+        self.filename = filename
+        decoder = Decoder(measurement_system, self.decoded_message_types)
+        with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as file_map:
+            messages = {}
+            for message in decoder.messages(file_map):
+                messages.setdefault(message.type, message)
+        self.__sumarize(messages, decoder)
+
+    def __sumarize(self, messages, decoder):
+        file_id = messages.get(MessageType.file_id)
+        if file_id is not None:
+            self.type = file_id.fields.type
+            self.manufacturer = file_id.fields.manufacturer
+            self.product = file_id.fields.product
+            self.serial_number = file_id.fields.serial_number
+            self.time_created = file_id.fields.time_created
+        else:
+            logger.warning("%s has no file_id message", self.filename)
+            self.type = None
+            self.manufacturer = None
+            self.product = None
+            self.serial_number = None
+            self.time_created = None
+        device_settings = messages.get(MessageType.device_settings)
+        self.utc_offset = device_settings.fields.time_offset if device_settings is not None else None
+        sport = messages.get(MessageType.sport)
+        if sport is not None:
+            self.sport_type = sport.fields.sport
+            self.sub_sport_type = sport.fields.sub_sport
+        else:
+            self.sport_type = None
+            self.sub_sport_type = None
+        self.first_timestamp = decoder.first_timestamp
+        self.last_timestamp = decoder.last_timestamp
+        self.message_type_counts = dict(decoder.message_type_counts)
+        self.record_count = decoder.record_count
+
+    def __str__(self):
+        """Return a string representation of a QuickSummary instance."""
+        return (f'{self.__class__.__name__}({self.filename} {repr(self.type)} {self.product} {self.serial_number} '
+                + f'{self.first_timestamp} - {self.last_timestamp} {len(self.message_type_counts)} message types)')
+
+    def __repr__(self):
+        """Return a string representation of a QuickSummary instance."""
+        return self.__str__()
+
+
+def quick_summary(filename, measurement_system=DisplayMeasure.metric):
+    """
+    Return a QuickSummary of a FIT file: the file_id fields, first and last timestamps, and a count of the messages of each message type.
+
+    Parameters:
+    ----------
+        filename (string): The name of the FIT file including full path.
+        measurement_system (DisplayMeasure): The measurement units (metric, statute, etc) to use when decoding messages.
+
+    """
+    return QuickSummary(filename, measurement_system)
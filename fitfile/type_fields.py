@@ -5,7 +5,7 @@ __copyright__ = "Copyright Tom Goetz"
 __license__ = "GPL"
 
 
-from .fields import Field, NamedField
+from .fields import Field, NamedField, sequence_types
 from .field_definition import FieldDefinition
 
 
@@ -68,10 +68,16 @@ class StringField(NamedField):
     """A FIT file message field with a string value."""
 
     def _invalid_single(self, value, invalid):
+        if isinstance(value, bytes):
+            # The invalid value for a string is an empty string.
+            return value[:1] in (b'', b'\0')
         return (value < 0) or (value > 127)
 
     def _convert_many(self, value, invalid):
-        if isinstance(value, list):
+        if isinstance(value, bytes):
+            # FIT strings are null terminated UTF-8.
+            return value.split(b'\0', 1)[0].decode('utf-8', 'replace').strip()
+        if isinstance(value, sequence_types):
             converted_value = ""
             for aschii_index in value:
                 if aschii_index == 0:
@@ -86,7 +92,7 @@ class BytesField(NamedField):
     """A FIT file message field with a bytearray value."""
 
     def _convert_many(self, value, invalid):
-        if isinstance(value, list):
+        if isinstance(value, sequence_types):
             converted_value = bytearray()
             for character in value:
                 converted_value.append(character)
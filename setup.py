@@ -40,6 +40,7 @@ setup(name=module_name, version=module_version, author='Tom Goetz', packages=[mo
       long_description_content_type='text/x-rst',
       url="https://github.com/tcgoetz/Fit",
       install_requires=install_requires,
+      extras_require={'numpy': ['numpy']},
       classifiers=[
           'License :: OSI Approved :: GNU General Public License v2 (GPLv2)',
           "Programming Language :: Python :: 3",
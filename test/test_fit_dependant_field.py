@@ -9,6 +9,7 @@ import logging
 
 from fitfile import field_enums
 from fitfile.product import GarminProduct
+from fitfile.manufacturer import Manufacturer
 from fitfile import manufacturer_product_fields as mp_fields
 
 
@@ -35,6 +36,13 @@ class TestFitDependantField(unittest.TestCase):
         self.assertIsInstance(field_value['product'], mp_fields.GarminProduct)
         self.assertEqual(field_value['product'], GarminProduct.Fenix_5_Sapphire)
 
+    def test_resolve_dependant_field(self):
+        field = mp_fields.ProductField()
+        garmin_field = field.resolve_dependant_field([Manufacturer.Garmin])
+        self.assertIsInstance(garmin_field, mp_fields.GarminProductField)
+        self.assertIs(field.resolve_dependant_field([Manufacturer.Garmin]), garmin_field)
+        self.assertIsInstance(field.resolve_dependant_field([None]), mp_fields.UnknownProductField)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
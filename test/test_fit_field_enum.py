@@ -9,6 +9,7 @@ import logging
 
 from fitfile import field_enums
 from fitfile import enum_fields
+from fitfile import product
 
 
 root_logger = logging.getLogger()
@@ -38,6 +39,19 @@ class TestFitFieldEnum(unittest.TestCase):
     def test_field_enum_fuzzy_statute(self):
         self.assertEqual(field_enums.DisplayMeasure.from_string('statute_us'), field_enums.DisplayMeasure.statute)
 
+    def test_field_enum_strict(self):
+        self.assertEqual(field_enums.Switch.strict_from_string('auto'), field_enums.Switch.auto)
+        self.assertEqual(field_enums.Switch.strict_from_string(2), field_enums.Switch.auto)
+        self.assertIsNone(field_enums.Switch.strict_from_string('from_string'))
+        self.assertIsNone(field_enums.Switch.strict_from_string(['unhashable']))
+
+    def test_field_enum_unknown_interned(self):
+        self.assertIs(field_enums.Switch.from_string(10), field_enums.Switch.from_string(10))
+        self.assertIs(product.GarminProduct.from_string(65000), product.GarminProduct.from_string(65000))
+        self.assertIsInstance(product.GarminProduct.from_string(65000), field_enums.UnknownEnumValue)
+        self.assertEqual(product.GarminProduct.from_string('Edge_520_plus'), product.GarminProduct.from_string('edge_520_PLUS'))
+        self.assertIs(product.UnknownProduct.from_string(7), product.UnknownProduct.from_string(7))
+
     def test_enum_field_valid_conversion(self):
         switch = enum_fields.SwitchField('test')
         field_value_list = switch.convert(1, 255)
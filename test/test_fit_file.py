@@ -0,0 +1,501 @@
+"""Test FIT file parsing from files and in memory buffers."""
+
+__author__ = "Tom Goetz"
+__copyright__ = "Copyright Tom Goetz"
+__license__ = "GPL"
+
+import unittest
+import unittest.mock
+import logging
+import datetime
+import struct
+import tempfile
+import os
+import concurrent.futures
+import asyncio
+import array
+
+import fitfile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+root_logger = logging.getLogger()
+handler = logging.FileHandler('fit_file.log', 'w')
+root_logger.addHandler(handler)
+root_logger.setLevel(logging.INFO)
+
+logger = logging.getLogger(__name__)
+
+
+class FitFileBuilder():
+    """Build the bytes of a small FIT file for testing."""
+
+    base_types = {'B': 0x02, 'H': 0x84, 'I': 0x86, 'i': 0x85, 's': 0x07}
+
+    def __init__(self):
+        self.records = bytearray()
+        self.definitions = {}
+
+    def definition(self, local_message, global_message, fields, big_endian=False, dev_fields=None):
+        """Add a definition message given a list of (field number, struct format) tuples and (field number, struct format, developer data index) tuples."""
+        endian = '>' if big_endian else '<'
+        record_header = 0x40 | local_message | (0x20 if dev_fields else 0)
+        self.records += struct.pack(endian + 'BBBHB', record_header, 0, int(big_endian), global_message, len(fields))
+        for field_number, field_format in fields:
+            self.records += struct.pack('<BBB', field_number, struct.calcsize(field_format), self.base_types[field_format[-1]])
+        if dev_fields:
+            self.records += struct.pack('<B', len(dev_fields))
+            for field_number, field_format, developer_data_index in dev_fields:
+                self.records += struct.pack('<BBB', field_number, struct.calcsize(field_format), developer_data_index)
+        self.definitions[local_message] = endian + ''.join(field_format for _, field_format, *_ in fields + (dev_fields or []))
+
+    def add_file_id(self, file_type=fitfile.FileType.activity, extra_fields=(), extra_values=()):
+        """Add the file_id definition and data message, as local message 0, that start a file, with extra fields if given."""
+        self.definition(0, fitfile.MessageType.file_id.value, [(0, 'B'), (1, 'H'), (2, 'H'), (3, 'I'), (4, 'I')] + list(extra_fields))
+        self.data(0, file_type.value, fitfile.Manufacturer.Garmin.value, fitfile.GarminProduct.Fenix_5_Sapphire.value, 1234, 936189712, *extra_values)
+
+    def data(self, local_message, *values):
+        """Add a data message for a previously defined local message."""
+        self.records += struct.pack('<B', local_message) + struct.pack(self.definitions[local_message], *values)
+
+    def compressed_timestamp_data(self, local_message, time_offset, *values):
+        """Add a data message with a compressed timestamp record header for a previously defined local message."""
+        self.records += struct.pack('<B', 0x80 | (local_message << 5) | time_offset) + struct.pack(self.definitions[local_message], *values)
+
+    def bytes(self, header_crc=False):
+        """Return the FIT file as bytes."""
+        if header_crc:
+            header = struct.pack('<BBHI4s', 14, 0x20, 2132, len(self.records), b'.FIT')
+            header += struct.pack('<H', fitfile.Crc.calculate(header))
+        else:
+            header = struct.pack('<BBHI4s', 12, 0x20, 2132, len(self.records), b'.FIT')
+        file_bytes = header + bytes(self.records)
+        return file_bytes + struct.pack('<H', fitfile.Crc.calculate(file_bytes))
+
+
+def activity_file_bytes(records=3, header_crc=False):
+    """Return the bytes of a FIT file containing a file_id message and some record messages."""
+    builder = FitFileBuilder()
+    builder.add_file_id()
+    builder.definition(1, fitfile.MessageType.record.value, [(253, 'I'), (3, 'B'), (0, 'i'), (5, 'I')])
+    for index in range(records):
+        builder.data(1, 936189712 + index, 120 + index if index != 1 else 0xff, 500000000, index * 100000)
+    return builder.bytes(header_crc)
+
+
+class TestFitFile(unittest.TestCase):
+    """Class for testing FIT file parsing."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.file_bytes = activity_file_bytes()
+
+    def write_file(self, dir):
+        filename = os.path.join(dir, 'activity.fit')
+        with open(filename, 'wb') as file:
+            file.write(self.file_bytes)
+        return filename
+
+    def check_file(self, fit_file):
+        self.assertEqual(fit_file.type, fitfile.FileType.activity)
+        self.assertEqual(fit_file.product, fitfile.GarminProduct.Fenix_5_Sapphire)
+        self.assertEqual(fit_file.serial_number, 1234)
+        self.assertEqual(len(fit_file.record), 3)
+        self.assertEqual([record.fields.heart_rate for record in fit_file.record], [120, None, 122])
+        self.assertEqual(fit_file.record[2].fields.timestamp, datetime.datetime(2019, 8, 31, 12, 41, 54, tzinfo=datetime.timezone.utc))
+
+    def test_from_bytes(self):
+        self.check_file(fitfile.File.from_bytes(self.file_bytes))
+
+    def test_from_memoryview(self):
+        self.check_file(fitfile.File.from_bytes(memoryview(bytearray(self.file_bytes))))
+
+    def test_from_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = self.write_file(temp_dir)
+            self.check_file(fitfile.File(filename))
+            self.check_file(fitfile.File(filename, mmap=True))
+
+    def test_iter_messages(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = self.write_file(temp_dir)
+            messages = list(fitfile.iter_messages(filename, types={fitfile.MessageType.record}))
+            self.assertEqual([message.type for message in messages], [fitfile.MessageType.record] * 3)
+            self.assertEqual(messages[0].fields.heart_rate, 120)
+            self.assertEqual(len(list(fitfile.iter_messages(filename))), 4)
+
+    def test_message_types_filter(self):
+        fit_file = fitfile.File.from_bytes(self.file_bytes, message_types={fitfile.MessageType.session})
+        self.assertEqual(fit_file.record, [])
+        self.assertEqual(fit_file.message_types, [fitfile.MessageType.file_id])
+        self.assertEqual(fit_file.product, fitfile.GarminProduct.Fenix_5_Sapphire)
+        self.assertEqual(fit_file.last_message_timestamp, datetime.datetime(2019, 8, 31, 12, 41, 54, tzinfo=datetime.timezone.utc))
+
+    def test_lazy(self):
+        fit_file = fitfile.File.from_bytes(self.file_bytes, lazy=True)
+        self.check_file(fit_file)
+        eager_fit_file = fitfile.File.from_bytes(self.file_bytes)
+        for message, eager_message in zip(fit_file.messages, eager_fit_file.messages):
+            self.assertEqual(dict(message.fields), dict(eager_message.fields))
+            self.assertEqual(sorted(message.field_values.keys()), sorted(eager_message.field_values.keys()))
+
+    def test_lazy_sub_fields(self):
+        builder = FitFileBuilder()
+        builder.add_file_id(fitfile.FileType.monitoring_b)
+        # current_activity_type_intensity holds the activity_type sub field that the cycles field depends on.
+        builder.definition(1, fitfile.MessageType.monitoring.value, [(253, 'I'), (3, 'I'), (24, 'B')])
+        builder.data(1, 936189712, 1000, fitfile.field_enums.ActivityType.walking.value | (3 << 5))
+        eager_message = fitfile.File.from_bytes(builder.bytes()).monitoring[0]
+        self.assertEqual(eager_message.fields.steps, 1000.0)
+        for options in [{'lazy': True}, {'compact': True}]:
+            message = fitfile.File.from_bytes(builder.bytes(), **options).monitoring[0]
+            self.assertIn('activity_type', message.field_values)
+            self.assertEqual(message.field_values['activity_type'].first(), fitfile.field_enums.ActivityType.walking)
+            self.assertNotIn('current_activity_type_intensity', message.field_values)
+            self.assertEqual(dict(message.fields), dict(eager_message.fields))
+            self.assertEqual(dict(message.field_values), dict(eager_message.field_values))
+
+    def test_compact(self):
+        fit_file = fitfile.File.from_bytes(self.file_bytes, compact=True)
+        self.check_file(fit_file)
+        eager_fit_file = fitfile.File.from_bytes(self.file_bytes)
+        for message, eager_message in zip(fit_file.messages, eager_fit_file.messages):
+            self.assertEqual(dict(message.fields), dict(eager_message.fields))
+            self.assertEqual(dict(message.field_values), dict(eager_message.field_values))
+        self.assertEqual(fit_file.record[0].field_values.heart_rate.orig, 120)
+        self.assertNotIn('power', fit_file.record[0].fields)
+        fit_file = fitfile.File.from_bytes(self.file_bytes, compact=True, keep_messages=False)
+        self.assertEqual(fit_file.messages, [])
+        self.check_file(fit_file)
+
+    def test_raw(self):
+        fit_file = fitfile.File.from_bytes(self.file_bytes, raw=True)
+        self.assertEqual(fit_file.product, fitfile.GarminProduct.Fenix_5_Sapphire)
+        record = fit_file.record[1]
+        self.assertEqual(dict(record.fields), {'timestamp': 936189713, 'heart_rate': 0xff, 'position_lat': 500000000, 'distance': 100000})
+        self.assertEqual(record.field_info['heart_rate'], ('bpm', 1.0, 0.0, 0xff))
+        self.assertTrue(record.field_values.heart_rate.is_invalid())
+        position_lat = record.field_info['position_lat']
+        self.assertAlmostEqual(record.fields.position_lat / position_lat.scale + position_lat.offset, fitfile.File.from_bytes(self.file_bytes).record[1].fields.position_lat)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            messages = list(fitfile.iter_messages(self.write_file(temp_dir), types={fitfile.MessageType.record}, raw=True))
+        self.assertEqual([message.fields.timestamp for message in messages], [936189712, 936189713, 936189714])
+
+    def test_compact_messages(self):
+        for lazy in [False, True]:
+            message = fitfile.File.from_bytes(self.file_bytes, lazy=lazy).record[0]
+            self.assertFalse(hasattr(message, '__dict__'))
+            self.assertFalse(hasattr(message.field_values.heart_rate, '__dict__'))
+            self.assertEqual(message.file_size, 13)
+
+    @unittest.skipIf(numpy is None, 'requires NumPy')
+    def test_to_columns(self):
+        fit_file = fitfile.File.from_bytes(self.file_bytes)
+        columns = fit_file.to_columns(fitfile.MessageType.record, fields=['timestamp', 'heart_rate', 'position_lat', 'power'])
+        self.assertEqual(list(columns['timestamp']), list(numpy.array(['2019-08-31T12:41:52', '2019-08-31T12:41:53', '2019-08-31T12:41:54'], dtype='datetime64[s]')))
+        self.assertEqual(columns['heart_rate'].tolist(), [120.0, None, 122.0])
+        self.assertAlmostEqual(columns['position_lat'][0], fit_file.record[0].fields.position_lat)
+        self.assertTrue(columns['power'].mask.all())
+        self.assertEqual(list(fit_file.to_columns(fitfile.MessageType.record)), ['timestamp', 'heart_rate', 'position_lat', 'distance'])
+
+    @unittest.skipIf(numpy is None, 'requires NumPy')
+    def test_to_columns_dependant_fields(self):
+        builder = FitFileBuilder()
+        builder.add_file_id(fitfile.FileType.monitoring_b)
+        builder.definition(1, fitfile.MessageType.monitoring.value, [(253, 'I'), (3, 'I'), (5, 'B')])
+        # Monitoring cycles are steps when walking, strokes when cycling, and plain cycles for generic activities.
+        builder.data(1, 936189712, 1000, fitfile.field_enums.ActivityType.walking.value)
+        builder.data(1, 936189713, 400, fitfile.field_enums.ActivityType.cycling.value)
+        builder.data(1, 936189714, 300, fitfile.field_enums.ActivityType.generic.value)
+        builder.data(1, 936189715, 2000, fitfile.field_enums.ActivityType.walking.value)
+        fit_file = fitfile.File.from_bytes(builder.bytes())
+        columns = fit_file.to_columns(fitfile.MessageType.monitoring)
+        self.assertEqual(list(columns), ['timestamp', 'steps', 'activity_type', 'strokes', 'cycles'])
+        for name in ['steps', 'strokes', 'cycles']:
+            self.assertEqual(columns[name].tolist(), [message.fields.get(name) for message in fit_file.monitoring])
+        self.assertEqual(columns['steps'].tolist(), [1000.0, None, None, 2000.0])
+        self.assertEqual(fit_file.to_columns(fitfile.MessageType.monitoring, fields=['steps'])['steps'].count(), 2)
+
+    @unittest.skipIf(numpy is None, 'requires NumPy')
+    def test_to_columns_timestamp_16(self):
+        TimestampMode = fitfile.field_enums.TimestampMode
+        builder = FitFileBuilder()
+        builder.add_file_id(fitfile.FileType.monitoring_b)
+        builder.definition(1, fitfile.MessageType.monitoring.value, [(253, 'I'), (3, 'I')])
+        builder.data(1, 936189712, 1000)
+        builder.definition(2, fitfile.MessageType.monitoring.value, [(26, 'H'), (3, 'I')])
+        builder.data(2, (936189712 + 60) & 0xffff, 2000)
+        expected = list(numpy.array(['2019-08-31T12:41:52', '2019-08-31T12:42:52'], dtype='datetime64[s]'))
+        for timestamp_mode in TimestampMode:
+            for raw in [False, True]:
+                fit_file = fitfile.File.from_bytes(builder.bytes(), raw=raw, timestamp_mode=timestamp_mode)
+                self.assertEqual(list(fit_file.to_columns(fitfile.MessageType.monitoring, fields=['timestamp'])['timestamp']), expected)
+
+    def test_definition_cache(self):
+        first = fitfile.File.from_bytes(self.file_bytes)
+        second = fitfile.File.from_bytes(self.file_bytes)
+        self.assertIs(first.record[0]._definition_message, second.record[0]._definition_message)
+        self.check_file(second)
+
+    def test_strings(self):
+        builder = FitFileBuilder()
+        builder.add_file_id(extra_fields=[(7, '16s')], extra_values=['Fēnix 5 ☀'.encode('utf-8')])
+        builder.definition(1, fitfile.MessageType.file_id.value, [(7, '4s')])
+        builder.data(1, b'\0\0\0\0')
+        (file_id, empty_file_id) = fitfile.File.from_bytes(builder.bytes()).file_id
+        self.assertEqual(file_id.fields.product_name, 'Fēnix 5 ☀')
+        self.assertFalse(file_id.field_values.product_name.is_invalid())
+        self.assertEqual(empty_file_id.fields.product_name, '')
+        self.assertTrue(empty_file_id.field_values.product_name.is_invalid())
+
+    def test_string_base_type_numbers(self):
+        builder = FitFileBuilder()
+        builder.add_file_id(extra_fields=[(77, '6s')], extra_values=[b'abc'])
+        builder.definition(1, fitfile.MessageType.record.value, [(253, 'I'), (3, '1s')])
+        builder.data(1, 936189712, b'x')
+        fit_file = fitfile.File.from_bytes(builder.bytes())
+        self.assertEqual(fit_file.file_id[0].fields.unknown_77, [97.0, 98.0, 99.0, None, None, None])
+        self.assertEqual(fit_file.record[0].fields.heart_rate, 120)
+
+    def test_field_parse_error(self):
+        builder = FitFileBuilder()
+        builder.add_file_id()
+        builder.definition(1, fitfile.MessageType.record.value, [(253, 'I'), (0, '2i')])
+        builder.data(1, 936189712, 500000000, 500000001)
+        with self.assertRaises(fitfile.exceptions.FitMessageParse):
+            fitfile.File.from_bytes(builder.bytes())
+        for options in [{'lazy': True}, {'compact': True}]:
+            record = fitfile.File.from_bytes(builder.bytes(), **options).record[0]
+            self.assertIn('500000000', repr(record))
+            with self.assertRaises(fitfile.exceptions.FitMessageParse):
+                record.fields.position_lat
+
+    def test_array_fields(self):
+        builder = FitFileBuilder()
+        builder.add_file_id()
+        builder.definition(1, fitfile.MessageType.hrv.value, [(0, '3H')])
+        builder.data(1, 800, 0xffff, 1200)
+        builder.definition(2, fitfile.MessageType.hrv.value, [(0, '3H')], big_endian=True)
+        builder.data(2, 800, 900, 1200)
+        builder.definition(3, fitfile.MessageType.record.value, [(253, 'I'), (100, '2I')])
+        builder.data(3, 936189712, 7, 0xffffffff)
+        (little, big) = fitfile.File.from_bytes(builder.bytes()).hrv
+        self.assertEqual(little.field_values.time.orig, array.array('H', [800, 0xffff, 1200]))
+        self.assertEqual(big.field_values.time.orig, array.array('H', [800, 900, 1200]))
+        self.assertEqual(big.fields.time, [datetime.time(0, 0, 0, 800000), datetime.time(0, 0, 0, 900000), datetime.time(0, 0, 1, 200000)])
+        self.assertEqual(little.fields.time[1], None)
+        record = fitfile.File.from_bytes(builder.bytes()).record[0]
+        self.assertEqual(record.fields.unknown_100, [7.0, None])
+        self.assertTrue(record.field_values.unknown_100.is_invalid())
+
+    def test_dev_fields(self):
+        builder = FitFileBuilder()
+        builder.add_file_id()
+        builder.definition(1, fitfile.MessageType.field_description.value, [(0, 'B'), (1, 'B'), (2, 'B'), (3, '16s'), (8, '8s')])
+        # Two apps, i.e. Connect IQ data fields, that both use field number 0.
+        builder.data(1, 0, 0, 0x84, b'Power', b'watts')
+        builder.data(1, 1, 0, 0x07, b'mood', b'')
+        builder.definition(2, fitfile.MessageType.record.value, [(253, 'I')], dev_fields=[(0, 'H', 0), (0, '8s', 1)])
+        builder.data(2, 936189712, 250, b'happy')
+        builder.data(2, 936189713, 0xffff, b'')
+        builder.definition(3, fitfile.MessageType.record.value, [(253, 'I'), (3, 'B')], dev_fields=[(0, 'H', 0)])
+        builder.data(3, 936189714, 120, 260)
+        fit_file = fitfile.File.from_bytes(builder.bytes())
+        self.assertEqual([record.fields.dev_Power for record in fit_file.record], [250, None, 260])
+        self.assertEqual([record.fields.get('dev_mood') for record in fit_file.record], ['happy', '', None])
+        for lazy in [False, True]:
+            record = fitfile.File.from_bytes(builder.bytes(), lazy=lazy).record[0]
+            self.assertIn('dev_power', record.field_values)
+            self.assertEqual(record.field_values.dev_power.field.units, 'watts')
+            self.assertEqual(record.fields.dev_Power, 250)
+        # The converter is built once per field_description and shared by the definitions that use the dev field.
+        (first, _, third) = [record._definition_message.resolved_dev_fields[0][0] for record in fit_file.record]
+        self.assertIs(first, third)
+
+    def test_unknown_fields(self):
+        builder = FitFileBuilder()
+        builder.add_file_id()
+        builder.definition(1, fitfile.MessageType.record.value, [(253, 'I'), (100, 'H')])
+        builder.data(1, 936189712, 7)
+        builder.data(1, 936189713, 8)
+        fit_file = fitfile.File.from_bytes(builder.bytes())
+        self.assertEqual([record.fields.unknown_100 for record in fit_file.record], [7, 8])
+        (first, second) = [record.field_values.unknown_100.field for record in fit_file.record]
+        self.assertIs(first, second)
+
+    def test_compressed_timestamps(self):
+        builder = FitFileBuilder()
+        builder.add_file_id()
+        builder.definition(1, fitfile.MessageType.record.value, [(253, 'I'), (3, 'B')])
+        builder.data(1, 936189712, 99)
+        builder.definition(3, fitfile.MessageType.record.value, [(3, 'B')])
+        # 936189712 has a time offset of 16, the second compressed timestamp rolls over
+        for time_offset, heart_rate in [(20, 100), (2, 101), (2, 102)]:
+            builder.compressed_timestamp_data(3, time_offset, heart_rate)
+        fit_file = fitfile.File.from_bytes(builder.bytes())
+        self.assertEqual([record.fields.heart_rate for record in fit_file.record], [99, 100, 101, 102])
+        time_created = fit_file.time_created
+        self.assertEqual([record.fields.timestamp for record in fit_file.record],
+                         [time_created + datetime.timedelta(seconds=seconds) for seconds in [0, 4, 18, 18]])
+        self.assertEqual(fit_file.last_message_timestamp, time_created + datetime.timedelta(seconds=18))
+        fit_file = fitfile.File.from_bytes(builder.bytes(), timestamp_mode=fitfile.field_enums.TimestampMode.fit_seconds)
+        self.assertEqual([record.fields.timestamp for record in fit_file.record], [936189712, 936189716, 936189730, 936189730])
+        self.assertEqual(fit_file.time_created, time_created)
+
+    def test_timestamp_modes(self):
+        TimestampMode = fitfile.field_enums.TimestampMode
+        expected = [datetime.datetime(2019, 8, 31, 12, 41, 52 + seconds, tzinfo=datetime.timezone.utc) for seconds in range(3)]
+        fit_file = fitfile.File.from_bytes(self.file_bytes)
+        self.assertEqual([record.fields.timestamp for record in fit_file.record], expected)
+        fit_file = fitfile.File.from_bytes(self.file_bytes, timestamp_mode=TimestampMode.fit_seconds)
+        self.assertEqual([record.fields.timestamp for record in fit_file.record], [936189712, 936189713, 936189714])
+        self.assertEqual(fit_file.time_created, expected[0])
+        fit_file = fitfile.File.from_bytes(self.file_bytes, timestamp_mode=TimestampMode.unix_seconds)
+        self.assertEqual([record.fields.timestamp for record in fit_file.record], [int(timestamp.timestamp()) for timestamp in expected])
+        self.assertEqual(fit_file.start_time, expected[0])
+        self.assertEqual([record.fields.heart_rate for record in fit_file.record], [120, None, 122])
+
+    def test_invalid_timestamp_modes(self):
+        builder = FitFileBuilder()
+        builder.add_file_id()
+        builder.definition(1, fitfile.MessageType.record.value, [(253, 'I'), (3, 'B')])
+        builder.data(1, 0xffffffff, 120)
+        records = {timestamp_mode: fitfile.File.from_bytes(builder.bytes(), timestamp_mode=timestamp_mode).record[0] for timestamp_mode in fitfile.field_enums.TimestampMode}
+        datetime_timestamp = records[fitfile.field_enums.TimestampMode.datetime].fields.timestamp
+        self.assertEqual(records[fitfile.field_enums.TimestampMode.fit_seconds].fields.timestamp, 0xffffffff)
+        self.assertEqual(records[fitfile.field_enums.TimestampMode.unix_seconds].fields.timestamp, int(datetime_timestamp.timestamp()))
+        for record in records.values():
+            self.assertEqual(dict(record.fields).keys(), {'timestamp', 'heart_rate'})
+            self.assertTrue(record.field_values.timestamp.is_invalid())
+
+    def test_crc(self):
+        self.assertEqual(fitfile.Crc.calculate(b'123456789'), 0xbb3d)
+        crc = fitfile.Crc()
+        crc.update(b'1234')
+        self.assertEqual(crc.update(memoryview(b'56789')), 0xbb3d)
+
+    def test_verify_crc(self):
+        fit_file = fitfile.File.from_bytes(self.file_bytes, verify_crc=True)
+        self.assertIsNone(fit_file.header_crc_ok)
+        self.assertTrue(fit_file.file_crc_ok)
+        fit_file = fitfile.File.from_bytes(activity_file_bytes(header_crc=True), verify_crc=True, message_types=[fitfile.MessageType.session])
+        self.assertTrue(fit_file.header_crc_ok)
+        self.assertTrue(fit_file.file_crc_ok)
+        corrupted = bytearray(activity_file_bytes(header_crc=True))
+        corrupted[3] ^= 0x01
+        corrupted[-5] ^= 0x01
+        fit_file = fitfile.File.from_bytes(corrupted, verify_crc=True)
+        self.assertFalse(fit_file.header_crc_ok)
+        self.assertFalse(fit_file.file_crc_ok)
+        self.assertIsNone(fitfile.File.from_bytes(corrupted).file_crc_ok)
+
+    def test_chained_files(self):
+        chained_bytes = self.file_bytes + activity_file_bytes(records=2, header_crc=True) + b'\0'
+        fit_file = fitfile.File.from_bytes(chained_bytes, verify_crc=True)
+        self.assertEqual(len(fit_file.file_id), 2)
+        self.assertEqual(len(fit_file.record), 5)
+        self.assertEqual(len(fit_file.segments), 2)
+        self.assertEqual([segment.offset for segment in fit_file.segments], [0, len(self.file_bytes)])
+        self.assertEqual([segment.first_message for segment in fit_file.segments], [0, 4])
+        self.assertEqual([segment.message_count for segment in fit_file.segments], [4, 3])
+        self.assertEqual([segment.file_crc_ok for segment in fit_file.segments], [True, True])
+        self.assertEqual([segment.header_crc_ok for segment in fit_file.segments], [None, True])
+        self.assertTrue(fit_file.file_crc_ok)
+        self.assertEqual(fit_file.last_message_timestamp, datetime.datetime(2019, 8, 31, 12, 41, 53, tzinfo=datetime.timezone.utc))
+
+    def test_quick_summary(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            summary = fitfile.quick_summary(self.write_file(temp_dir))
+        self.assertEqual(summary.type, fitfile.FileType.activity)
+        self.assertEqual(summary.product, fitfile.GarminProduct.Fenix_5_Sapphire)
+        self.assertEqual(summary.serial_number, 1234)
+        self.assertEqual(summary.time_created, datetime.datetime(2019, 8, 31, 12, 41, 52, tzinfo=datetime.timezone.utc))
+        self.assertEqual(summary.first_timestamp, datetime.datetime(2019, 8, 31, 12, 41, 52, tzinfo=datetime.timezone.utc))
+        self.assertEqual(summary.last_timestamp, datetime.datetime(2019, 8, 31, 12, 41, 54, tzinfo=datetime.timezone.utc))
+        self.assertEqual(summary.message_type_counts, {fitfile.MessageType.file_id: 1, fitfile.MessageType.record: 3})
+        self.assertIsNone(summary.sport_type)
+
+    def test_parse_many(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = self.write_file(temp_dir)
+            bad_filename = os.path.join(temp_dir, 'bad.fit')
+            with open(bad_filename, 'wb') as file:
+                file.write(self.file_bytes[:8])
+            results = list(fitfile.parse_many([filename, bad_filename, filename], workers=2))
+            self.assertEqual([result.filename for result in results], [filename, bad_filename, filename])
+            self.assertEqual([result.ok for result in results], [True, False, True])
+            self.assertEqual(results[0].product, fitfile.GarminProduct.Fenix_5_Sapphire)
+            self.assertEqual([fields['heart_rate'] for fields in results[2][fitfile.MessageType.record]], [120, None, 122])
+            self.assertIsNotNone(results[1].error)
+            unordered = list(fitfile.parse_many([filename, bad_filename], workers=2, ordered=False))
+            self.assertEqual(sorted(result.filename for result in unordered), sorted([filename, bad_filename]))
+            # Closing the generator early cancels the files that haven't been parsed yet.
+            for ordered in [True, False]:
+                results = fitfile.parse_many([filename] * 200, workers=1, ordered=ordered)
+                self.assertTrue(next(results).ok)
+                results.close()
+
+    def test_thread_pool(self):
+        measurement_systems = [fitfile.field_enums.DisplayMeasure.metric, fitfile.field_enums.DisplayMeasure.statute] * 20
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            fit_files = list(executor.map(lambda measurement_system: fitfile.File.from_bytes(self.file_bytes, measurement_system), measurement_systems))
+        for fit_file, measurement_system in zip(fit_files, measurement_systems):
+            expected = [0.0, 1.0, 2.0] if measurement_system is fitfile.field_enums.DisplayMeasure.metric else [0.0, 0.6213712, 1.2427424]
+            for record, distance in zip(fit_file.record, expected):
+                self.assertAlmostEqual(record.fields.distance, distance)
+        # The shared schemas are compiled for both byte orders when they're created, parsing never changes them.
+        schema = fitfile.definition_message.DefinitionMessage.dm_primary_schema
+        self.assertEqual(schema.get_unpack(fitfile.data.Architecture.Little_Endian), ('<BB', 2))
+        self.assertEqual(schema.get_unpack(fitfile.data.Architecture.Big_Endian), ('>BB', 2))
+
+    def stream(self, file_bytes):
+        reader = asyncio.StreamReader()
+        # feed the data in small pieces so that records are split across reads
+        for offset in range(0, len(file_bytes), 7):
+            reader.feed_data(file_bytes[offset:offset + 7])
+        reader.feed_eof()
+        return reader
+
+    def test_aparse(self):
+        async def parse():
+            return await fitfile.aparse(self.stream(self.file_bytes), verify_crc=True, chunk_size=5)
+        fit_file = asyncio.run(parse())
+        self.check_file(fit_file)
+        self.assertTrue(fit_file.file_crc_ok)
+
+    def test_aiter_messages(self):
+        async def iterate(file_bytes):
+            return [message async for message in fitfile.aiter_messages(self.stream(file_bytes), types={fitfile.MessageType.record}, chunk_size=5)]
+        messages = asyncio.run(iterate(self.file_bytes))
+        self.assertEqual([message.fields.heart_rate for message in messages], [120, None, 122])
+        with self.assertRaises(fitfile.exceptions.FitFileError):
+            asyncio.run(iterate(self.file_bytes[:-10]))
+
+    def test_parse_cache(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = self.write_file(temp_dir)
+            cache_dir = os.path.join(temp_dir, 'cache')
+            self.assertFalse(fitfile.File(filename, cache_dir=cache_dir).cached)
+            fit_file = fitfile.File(filename, cache_dir=cache_dir)
+            self.assertTrue(fit_file.cached)
+            self.check_file(fit_file)
+            self.assertEqual(fit_file.record_count, 6)
+            self.assertFalse(fitfile.File(filename, measurement_system=fitfile.field_enums.DisplayMeasure.statute, cache_dir=cache_dir).cached)
+            with self.assertRaises(fitfile.exceptions.FitFileError):
+                fit_file.to_columns(fitfile.MessageType.record)
+            # Failing to record the use of an entry doesn't fail the load.
+            with unittest.mock.patch('os.utime', side_effect=PermissionError):
+                self.assertTrue(fitfile.File(filename, cache_dir=cache_dir).cached)
+            # A cache too small to hold any files evicts each file as soon as it's stored.
+            small_cache_dir = os.path.join(temp_dir, 'small_cache')
+            fitfile.File(filename, cache_dir=small_cache_dir, cache_size=1)
+            self.assertEqual(os.listdir(small_cache_dir), [])
+            self.assertFalse(fitfile.File(filename, cache_dir=small_cache_dir, cache_size=1).cached)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)